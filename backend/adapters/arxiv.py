@@ -1,66 +1,75 @@
 import xml.etree.ElementTree as ET
 from adapters.base import BaseAdapter
 from models import ScholarlyPaper, Author, PaperSource
-from typing import List
-import httpx
+from typing import List, Optional
+from services.query import NormalizedQuery
 
 class ArxivAdapter(BaseAdapter):
-    async def search(self, query: str, limit: int = 10) -> List[ScholarlyPaper]:
+    name = "arXiv"
+    warm_url = "http://export.arxiv.org/"
+    # arXiv asks for no more than one request every few seconds
+    rate_limit = (0.5, 4)
+
+    def rewrite_query(self, query: NormalizedQuery) -> Optional[str]:
+        """arXiv field syntax: an id: lookup, or every term ANDed over all fields."""
+        if query.arxiv_id:
+            return f"id:{query.arxiv_id}"
+        if query.is_doi:
+            return None  # The API has no DOI field; a term search would only add noise
+        return " AND ".join(f"all:{token}" for token in query.tokens) or None
+
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> List[ScholarlyPaper]:
+        """Expects a search_query in arXiv syntax, see rewrite_query."""
         url = "http://export.arxiv.org/api/query"
         params = {
-            "search_query": f"all:{query}",
+            "search_query": query,
+            "start": offset,
             "max_results": limit
         }
         
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                root = ET.fromstring(response.text)
+        text = await self.fetch_text(url, params=params)
+        root = ET.fromstring(text)
+        
+        # XML namespaces
+        ns = {'atom': 'http://www.w3.org/2005/Atom'}
+        
+        results = []
+        for entry in root.findall('atom:entry', ns):
+            title = entry.find('atom:title', ns).text.strip()
+            authors = [Author(name=a.find('atom:name', ns).text) for a in entry.findall('atom:author', ns)]
+            
+            published = entry.find('atom:published', ns).text
+            year = int(published[:4]) if published else None
             
-            # XML namespaces
-            ns = {'atom': 'http://www.w3.org/2005/Atom'}
+            arxiv_id = entry.find('atom:id', ns).text.split('/abs/')[-1]
+            sources = []
             
-            results = []
-            for entry in root.findall('atom:entry', ns):
-                title = entry.find('atom:title', ns).text.strip()
-                authors = [Author(name=a.find('atom:name', ns).text) for a in entry.findall('atom:author', ns)]
-                
-                published = entry.find('atom:published', ns).text
-                year = int(published[:4]) if published else None
-                
-                arxiv_id = entry.find('atom:id', ns).text.split('/abs/')[-1]
-                sources = []
-                
-                # Abstract page
+            # Abstract page
+            sources.append(PaperSource(
+                url=f"https://arxiv.org/abs/{arxiv_id}",
+                label="Preprint Page",
+                access_type="preprint"
+            ))
+            
+            # PDF link
+            pdf_url = None
+            for link in entry.findall('atom:link', ns):
+                if link.attrib.get('title') == 'pdf':
+                    pdf_url = link.attrib.get('href')
+            
+            if pdf_url:
                 sources.append(PaperSource(
-                    url=f"https://arxiv.org/abs/{arxiv_id}",
-                    label="Preprint Page",
-                    access_type="preprint"
+                    url=pdf_url,
+                    label="Open Access PDF",
+                    access_type="oa"
                 ))
-                
-                # PDF link
-                pdf_url = None
-                for link in entry.findall('atom:link', ns):
-                    if link.attrib.get('title') == 'pdf':
-                        pdf_url = link.attrib.get('href')
-                
-                if pdf_url:
-                    sources.append(PaperSource(
-                        url=pdf_url,
-                        label="Open Access PDF",
-                        access_type="oa"
-                    ))
-                
-                results.append(ScholarlyPaper(
-                    title=title,
-                    authors=authors,
-                    year=year,
-                    journal="arXiv",
-                    sources=sources,
-                    source_api="arXiv"
-                ))
-            return results
-        except Exception as e:
-            print(f"arXiv Error: {e}")
-            return []
+            
+            results.append(ScholarlyPaper(
+                title=title,
+                authors=authors,
+                year=year,
+                journal="arXiv",
+                sources=sources,
+                source_api="arXiv"
+            ))
+        return results
@@ -1,19 +1,88 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from config import settings
 from models import ScholarlyPaper, Researcher
+from services import shared_store
+from services.outcomes import record_retry
+from services.query import NormalizedQuery
 import httpx
 
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the process-wide pooled client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def is_retryable(error: httpx.HTTPError) -> bool:
+    """Timeouts, dropped connections, 429 and 5xx are worth another attempt; other 4xx are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
 class BaseAdapter(ABC):
+    # Upstream name reported in source outcomes and logs
+    name: str = ""
+    # Whether search_authors is implemented; others are skipped for author searches
+    supports_authors: bool = False
+    # Origin pre-connected during warm-up so the first search skips DNS/TLS setup.
+    warm_url: Optional[str] = None
+    # (requests per second, burst), enforced across all workers on the host
+    rate_limit: Tuple[float, int] = (10.0, 10)
+
     @abstractmethod
-    async def search(self, query: str, limit: int = 10) -> List[ScholarlyPaper]:
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> List[ScholarlyPaper]:
+        """One page of results; offset is a multiple of limit when paging through a result session."""
         pass
 
     async def search_authors(self, query: str, limit: int = 10) -> List[Researcher]:
         """Optional method for adapters that support author search."""
         return []
 
+    def rewrite_query(self, query: NormalizedQuery) -> Optional[str]:
+        """Upstream query string for a normalized query; None skips this adapter."""
+        return query.text
+
+    async def warm_up(self):
+        """Opens a pooled keep-alive connection to the adapter's upstream."""
+        if not self.warm_url:
+            return
+        try:
+            await get_client().head(self.warm_url, timeout=5.0)
+        except httpx.HTTPError as e:
+            print(f"{type(self).__name__} warm-up failed: {e}")
+
+    async def throttle(self):
+        await shared_store.acquire(type(self).__name__, *self.rate_limit)
+
+    async def fetch(self, url: str, params: dict = None) -> httpx.Response:
+        """GET with the shared rate limit, retrying transient failures with exponential backoff."""
+        for attempt in range(settings.upstream_retries + 1):
+            await self.throttle()
+            try:
+                response = await get_client().get(url, params=params)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                if attempt == settings.upstream_retries or not is_retryable(e):
+                    raise
+            record_retry()
+            await asyncio.sleep(settings.upstream_retry_backoff * 2 ** attempt)
+
     async def fetch_json(self, url: str, params: dict = None) -> dict:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        return (await self.fetch(url, params)).json()
+
+    async def fetch_text(self, url: str, params: dict = None) -> str:
+        return (await self.fetch(url, params)).text
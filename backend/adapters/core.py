@@ -1,48 +1,57 @@
 from adapters.base import BaseAdapter
 from models import ScholarlyPaper, Author, PaperSource
 from typing import List
+from urllib.parse import quote
+from services.query import NormalizedQuery
 
 class CoreAdapter(BaseAdapter):
-    async def search(self, query: str, limit: int = 10) -> List[ScholarlyPaper]:
-        url = f"https://core.ac.uk:443/api-v2/articles/search/{query}"
+    name = "CORE"
+    warm_url = "https://core.ac.uk/"
+    rate_limit = (1.0, 5)
+
+    def rewrite_query(self, query: NormalizedQuery) -> str:
+        if query.is_doi:
+            return f'doi:"{query.doi}"'
+        return query.text
+
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> List[ScholarlyPaper]:
+        # The query is a path segment; "/", "?" and "#" would otherwise change the URL
+        url = f"https://core.ac.uk:443/api-v2/articles/search/{quote(query, safe='')}"
         params = {
+            "page": offset // limit + 1,
             "pageSize": limit
         }
         
-        try:
-            data = await self.fetch_json(url, params=params)
-            items = data.get("data", [])
+        data = await self.fetch_json(url, params=params)
+        items = data.get("data", [])
+        
+        results = []
+        for item in items:
+            authors = [Author(name=name) for name in item.get("authors", [])]
+            sources = []
             
-            results = []
-            for item in items:
-                authors = [Author(name=name) for name in item.get("authors", [])]
-                sources = []
-                
-                # Repository page
+            # Repository page
+            sources.append(PaperSource(
+                url=f"https://core.ac.uk/reader/{item.get('id')}",
+                label="Repository Version",
+                access_type="oa"
+            ))
+            
+            # PDF download link
+            if item.get("downloadUrl"):
                 sources.append(PaperSource(
-                    url=f"https://core.ac.uk/reader/{item.get('id')}",
-                    label="Repository Version",
+                    url=item["downloadUrl"],
+                    label="Open Access PDF",
                     access_type="oa"
                 ))
-                
-                # PDF download link
-                if item.get("downloadUrl"):
-                    sources.append(PaperSource(
-                        url=item["downloadUrl"],
-                        label="Open Access PDF",
-                        access_type="oa"
-                    ))
-                
-                results.append(ScholarlyPaper(
-                    title=item.get("title", "Unknown Title"),
-                    authors=authors,
-                    year=item.get("year"),
-                    journal=item.get("publisher", ""),
-                    doi=item.get("doi"),
-                    sources=sources,
-                    source_api="CORE"
-                ))
-            return results
-        except Exception as e:
-            print(f"CORE Error: {e}")
-            return []
+            
+            results.append(ScholarlyPaper(
+                title=item.get("title", "Unknown Title"),
+                authors=authors,
+                year=item.get("year"),
+                journal=item.get("publisher", ""),
+                doi=item.get("doi"),
+                sources=sources,
+                source_api="CORE"
+            ))
+        return results
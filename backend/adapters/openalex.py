@@ -1,76 +1,131 @@
+import asyncio
 from adapters.base import BaseAdapter
 from models import ScholarlyPaper, Author, PaperSource, Researcher
-from typing import List
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+def short_id(openalex_id: Optional[str]) -> Optional[str]:
+    """https://openalex.org/W2741809807 -> W2741809807"""
+    return openalex_id.rsplit("/", 1)[-1] if openalex_id else None
 
 class OpenAlexAdapter(BaseAdapter):
-    async def search(self, query: str, limit: int = 10) -> List[ScholarlyPaper]:
+    name = "OpenAlex"
+    supports_authors = True
+    warm_url = "https://api.openalex.org/"
+
+    # Fields needed to build a ScholarlyPaper plus its reference list
+    WORK_FIELDS = (
+        "id,doi,display_name,authorships,publication_year,primary_location,locations,"
+        "open_access,biblio,cited_by_count,referenced_works"
+    )
+    # OpenAlex accepts up to 100 OR-ed values per filter; 50 keeps URLs well under limits
+    BATCH_SIZE = 50
+
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> List[ScholarlyPaper]:
         url = "https://api.openalex.org/works"
         params = {
             "search": query,
+            "page": offset // limit + 1,
             "per_page": limit,
         }
         
-        try:
-            data = await self.fetch_json(url, params=params)
-            items = data.get("results", [])
-            
-            results = []
-            for item in items:
-                authors = [Author(name=a.get("author", {}).get("display_name", "")) for a in item.get("authorships", [])]
-                
-                sources = []
-                
-                # Primary location
-                primary = item.get("primary_location") or {}
-                if primary.get("landing_page_url"):
-                    sources.append(PaperSource(
-                        url=primary["landing_page_url"],
-                        label="Publisher Page",
-                        access_type="oa" if item.get("open_access", {}).get("is_oa") else "paywalled"
-                    ))
-                
-                # PDF links
-                if primary.get("pdf_url"):
-                    sources.append(PaperSource(
-                        url=primary["pdf_url"],
-                        label="Open Access PDF",
-                        access_type="oa"
-                    ))
-                
-                # Other locations (Repositories, etc.)
-                for loc in item.get("locations", []):
-                    if loc.get("landing_page_url") and loc.get("landing_page_url") not in [s.url for s in sources]:
-                        is_oa = loc.get("is_oa")
-                        sources.append(PaperSource(
-                            url=loc["landing_page_url"],
-                            label="Repository Version" if loc.get("location_type") == "repository" else "Publisher Page",
-                            access_type="oa" if is_oa else "paywalled"
-                        ))
-                    if loc.get("pdf_url") and loc.get("pdf_url") not in [s.url for s in sources]:
-                        sources.append(PaperSource(
-                            url=loc["pdf_url"],
-                            label="Open Access PDF",
-                            access_type="oa"
-                        ))
+        data = await self.fetch_json(url, params=params)
+        items = data.get("results", [])
+        return [self.parse_work(item) for item in items]
 
-                results.append(ScholarlyPaper(
-                    title=item.get("display_name", "Unknown Title"),
-                    authors=authors,
-                    year=item.get("publication_year"),
-                    journal=item.get("primary_location", {}).get("source", {}).get("display_name", ""),
-                    volume=item.get("biblio", {}).get("volume"),
-                    issue=item.get("biblio", {}).get("issue"),
-                    pages=f"{item.get('biblio', {}).get('first_page', '')}-{item.get('biblio', {}).get('last_page', '')}".strip("-"),
-                    doi=item.get("doi", "").split("doi.org/")[-1] if item.get("doi") else None,
-                    sources=sources,
-                    source_api="OpenAlex",
-                    citation_count=item.get("cited_by_count", 0),
-                    relevance_score=item.get("relevance_score", 0)
+    def parse_work(self, item: dict) -> ScholarlyPaper:
+        authors = [Author(name=a.get("author", {}).get("display_name", "")) for a in item.get("authorships", [])]
+        
+        sources = []
+        
+        # Primary location
+        primary = item.get("primary_location") or {}
+        if primary.get("landing_page_url"):
+            sources.append(PaperSource(
+                url=primary["landing_page_url"],
+                label="Publisher Page",
+                access_type="oa" if item.get("open_access", {}).get("is_oa") else "paywalled"
+            ))
+        
+        # PDF links
+        if primary.get("pdf_url"):
+            sources.append(PaperSource(
+                url=primary["pdf_url"],
+                label="Open Access PDF",
+                access_type="oa"
+            ))
+        
+        # Other locations (Repositories, etc.)
+        seen_urls = {s.url for s in sources}
+        for loc in item.get("locations", []):
+            if loc.get("landing_page_url") and loc.get("landing_page_url") not in seen_urls:
+                is_oa = loc.get("is_oa")
+                sources.append(PaperSource(
+                    url=loc["landing_page_url"],
+                    label="Repository Version" if loc.get("location_type") == "repository" else "Publisher Page",
+                    access_type="oa" if is_oa else "paywalled"
+                ))
+                seen_urls.add(loc["landing_page_url"])
+            if loc.get("pdf_url") and loc.get("pdf_url") not in seen_urls:
+                sources.append(PaperSource(
+                    url=loc["pdf_url"],
+                    label="Open Access PDF",
+                    access_type="oa"
                 ))
-            return results
-        except Exception as e:
-            print(f"OpenAlex Error: {e}")
-            return []
+                seen_urls.add(loc["pdf_url"])
+
+        biblio = item.get("biblio") or {}
+        return ScholarlyPaper(
+            title=item.get("display_name") or "Unknown Title",
+            authors=authors,
+            year=item.get("publication_year"),
+            journal=(primary.get("source") or {}).get("display_name", ""),
+            volume=biblio.get("volume"),
+            issue=biblio.get("issue"),
+            pages=f"{biblio.get('first_page') or ''}-{biblio.get('last_page') or ''}".strip("-"),
+            doi=item.get("doi", "").split("doi.org/")[-1] if item.get("doi") else None,
+            sources=sources,
+            source_api="OpenAlex",
+            openalex_id=short_id(item.get("id")),
+            citation_count=item.get("cited_by_count", 0),
+            relevance_score=item.get("relevance_score", 0)
+        )
+
+    async def fetch_work(self, work_id: str) -> Tuple[ScholarlyPaper, List[str]]:
+        """One work by OpenAlex ID or "doi:..." with the IDs of the works it references."""
+        item = await self.fetch_json(
+            f"https://api.openalex.org/works/{quote(work_id, safe=':/')}", params={"select": self.WORK_FIELDS}
+        )
+        return self.parse_work(item), [short_id(w) for w in item.get("referenced_works", [])]
+
+    async def fetch_works(self, work_ids: List[str]) -> List[Tuple[ScholarlyPaper, List[str]]]:
+        """Resolves many works in bulk: one filtered list call per BATCH_SIZE IDs, run concurrently."""
+        batches = [work_ids[i:i + self.BATCH_SIZE] for i in range(0, len(work_ids), self.BATCH_SIZE)]
+        pages = await asyncio.gather(*(
+            self.fetch_json("https://api.openalex.org/works", params={
+                "filter": f"openalex_id:{'|'.join(batch)}",
+                "per_page": len(batch),
+                "select": self.WORK_FIELDS,
+            })
+            for batch in batches
+        ))
+        return [
+            (self.parse_work(item), [short_id(w) for w in item.get("referenced_works", [])])
+            for page in pages for item in page.get("results", [])
+        ]
+
+    async def fetch_citing(self, work_id: str, limit: int) -> List[Tuple[ScholarlyPaper, List[str]]]:
+        """Most-cited works citing work_id, fetched whole in a single call."""
+        data = await self.fetch_json("https://api.openalex.org/works", params={
+            "filter": f"cites:{work_id}",
+            "sort": "cited_by_count:desc",
+            "per_page": limit,
+            "select": self.WORK_FIELDS,
+        })
+        return [
+            (self.parse_work(item), [short_id(w) for w in item.get("referenced_works", [])])
+            for item in data.get("results", [])
+        ]
 
     async def search_authors(self, query: str, limit: int = 10) -> List[Researcher]:
         url = "https://api.openalex.org/authors"
@@ -79,23 +134,19 @@ class OpenAlexAdapter(BaseAdapter):
             "per_page": limit,
         }
         
-        try:
-            data = await self.fetch_json(url, params=params)
-            items = data.get("results", [])
-            
-            results = []
-            for item in items:
-                results.append(Researcher(
-                    name=item.get("display_name", "Unknown Researcher"),
-                    id=item.get("id"),
-                    affiliation=item.get("last_known_institution", {}).get("display_name"),
-                    h_index=item.get("summary_stats", {}).get("h_index", 0),
-                    citation_count=item.get("cited_by_count", 0),
-                    paper_count=item.get("works_count", 0),
-                    url=item.get("id"),
-                    source="OpenAlex"
-                ))
-            return results
-        except Exception as e:
-            print(f"OpenAlex Author Error: {e}")
-            return []
+        data = await self.fetch_json(url, params=params)
+        items = data.get("results", [])
+        
+        results = []
+        for item in items:
+            results.append(Researcher(
+                name=item.get("display_name", "Unknown Researcher"),
+                id=item.get("id"),
+                affiliation=item.get("last_known_institution", {}).get("display_name"),
+                h_index=item.get("summary_stats", {}).get("h_index", 0),
+                citation_count=item.get("cited_by_count", 0),
+                paper_count=item.get("works_count", 0),
+                url=item.get("id"),
+                source="OpenAlex"
+            ))
+        return results
@@ -1,65 +1,83 @@
 from adapters.base import BaseAdapter
 from models import ScholarlyPaper, Author, PaperSource, Researcher
 from typing import List
+from urllib.parse import quote
 
 class SemanticScholarAdapter(BaseAdapter):
-    async def search(self, query: str, limit: int = 10) -> List[ScholarlyPaper]:
+    name = "Semantic Scholar"
+    supports_authors = True
+    warm_url = "https://api.semanticscholar.org/"
+    # Unauthenticated S2 traffic shares a small public pool
+    rate_limit = (1.0, 3)
+
+    PAPER_FIELDS = "title,authors,year,venue,externalIds,citationCount,openAccessPdf,url"
+
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> List[ScholarlyPaper]:
         url = "https://api.semanticscholar.org/graph/v1/paper/search"
         params = {
             "query": query,
+            "offset": offset,
             "limit": limit,
-            "fields": "title,authors,year,venue,externalIds,citationCount,openAccessPdf,url"
+            "fields": self.PAPER_FIELDS
         }
         
-        try:
-            data = await self.fetch_json(url, params=params)
-            items = data.get("data", [])
-            
-            results = []
-            for item in items:
-                authors = [Author(name=a.get("name", "")) for a in item.get("authors", [])]
-                
-                doi = item.get("externalIds", {}).get("DOI")
-                sources = []
-                
-                # S2 URL
-                if item.get("url"):
-                    sources.append(PaperSource(
-                        url=item["url"],
-                        label="Semantic Scholar Page",
-                        access_type="canonical"
-                    ))
-                
-                # DOI Link
-                if doi:
-                    sources.append(PaperSource(
-                        url=f"https://doi.org/{doi}",
-                        label="Publisher Page",
-                        access_type="paywalled"
-                    ))
-                
-                # PDF Link
-                if item.get("openAccessPdf") and item.get("openAccessPdf", {}).get("url"):
-                    sources.append(PaperSource(
-                        url=item["openAccessPdf"]["url"],
-                        label="Open Access PDF",
-                        access_type="oa"
-                    ))
-                
-                results.append(ScholarlyPaper(
-                    title=item.get("title", "Unknown Title"),
-                    authors=authors,
-                    year=item.get("year"),
-                    journal=item.get("venue"),
-                    doi=doi,
-                    sources=sources,
-                    source_api="Semantic Scholar",
-                    citation_count=item.get("citationCount", 0)
-                ))
-            return results
-        except Exception as e:
-            print(f"Semantic Scholar Error: {e}")
-            return []
+        data = await self.fetch_json(url, params=params)
+        items = data.get("data", [])
+        
+        return [self.parse_paper(item) for item in items]
+
+    def parse_paper(self, item: dict) -> ScholarlyPaper:
+        authors = [Author(name=a.get("name") or "") for a in item.get("authors") or []]
+        
+        doi = (item.get("externalIds") or {}).get("DOI")
+        sources = []
+        
+        # S2 URL
+        if item.get("url"):
+            sources.append(PaperSource(
+                url=item["url"],
+                label="Semantic Scholar Page",
+                access_type="canonical"
+            ))
+        
+        # DOI Link
+        if doi:
+            sources.append(PaperSource(
+                url=f"https://doi.org/{doi}",
+                label="Publisher Page",
+                access_type="paywalled"
+            ))
+        
+        # PDF Link
+        if item.get("openAccessPdf") and item.get("openAccessPdf", {}).get("url"):
+            sources.append(PaperSource(
+                url=item["openAccessPdf"]["url"],
+                label="Open Access PDF",
+                access_type="oa"
+            ))
+        
+        return ScholarlyPaper(
+            title=item.get("title", "Unknown Title"),
+            authors=authors,
+            year=item.get("year"),
+            journal=item.get("venue"),
+            doi=doi,
+            sources=sources,
+            source_api="Semantic Scholar",
+            citation_count=item.get("citationCount", 0)
+        )
+
+    async def fetch_neighbours(self, paper_id: str, relation: str, limit: int) -> List[ScholarlyPaper]:
+        """
+        References or citations of a paper ("DOI:...", "ARXIV:..." or an S2 paperId);
+        S2 returns the neighbours' metadata inline, so this is a single call.
+        """
+        data = await self.fetch_json(
+            f"https://api.semanticscholar.org/graph/v1/paper/{quote(paper_id, safe=':/')}/{relation}",
+            params={"fields": self.PAPER_FIELDS, "limit": limit}
+        )
+        key = "citedPaper" if relation == "references" else "citingPaper"
+        return [self.parse_paper(entry[key]) for entry in data.get("data") or [] if (entry.get(key) or {}).get("title")]
 
     async def search_authors(self, query: str, limit: int = 10) -> List[Researcher]:
         url = "https://api.semanticscholar.org/graph/v1/author/search"
@@ -69,26 +87,22 @@ class SemanticScholarAdapter(BaseAdapter):
             "fields": "name,affiliations,hIndex,citationCount,paperCount,url"
         }
         
-        try:
-            data = await self.fetch_json(url, params=params)
-            items = data.get("data", [])
+        data = await self.fetch_json(url, params=params)
+        items = data.get("data", [])
+        
+        results = []
+        for item in items:
+            affiliations = item.get("affiliations", [])
+            affiliation = affiliations[0] if affiliations else None
             
-            results = []
-            for item in items:
-                affiliations = item.get("affiliations", [])
-                affiliation = affiliations[0] if affiliations else None
-                
-                results.append(Researcher(
-                    name=item.get("name", "Unknown Researcher"),
-                    id=item.get("authorId"),
-                    affiliation=affiliation,
-                    h_index=item.get("hIndex", 0),
-                    citation_count=item.get("citationCount", 0),
-                    paper_count=item.get("paperCount", 0),
-                    url=item.get("url"),
-                    source="Semantic Scholar"
-                ))
-            return results
-        except Exception as e:
-            print(f"Semantic Scholar Author Error: {e}")
-            return []
+            results.append(Researcher(
+                name=item.get("name", "Unknown Researcher"),
+                id=item.get("authorId"),
+                affiliation=affiliation,
+                h_index=item.get("hIndex", 0),
+                citation_count=item.get("citationCount", 0),
+                paper_count=item.get("paperCount", 0),
+                url=item.get("url"),
+                source="Semantic Scholar"
+            ))
+        return results
@@ -0,0 +1,149 @@
+"""
+Load test for multi-worker deployments.
+
+CPU mode (default) runs the search post-processing (dedup, ranking, citation
+rendering) on synthetic result sets in 1..N worker processes and reports how
+throughput scales with core count. It also checks that the shared rate limiter
+holds one global budget no matter how many workers compete for it.
+
+HTTP mode fires concurrent /search requests at a running server, e.g. one
+started with WEB_CONCURRENCY=4:
+
+    python -m benchmarks.load_test --workers 1 2 4
+    python -m benchmarks.load_test --url http://localhost:10000 --concurrency 32
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import ScholarlyPaper, Author, PaperSource
+
+WORDS = (
+    "deep learning quantum graph neural network protein folding climate model "
+    "transformer attention causal inference bayesian optimization reinforcement "
+    "policy gradient sparse coding genome assembly dark matter catalysis"
+).split()
+
+def synthetic_result_set(seed: int, size: int = 50):
+    """Five adapters' worth of papers with the overlap real searches have."""
+    rng = random.Random(seed)
+    base = []
+    for i in range(size // 2):
+        base.append(dict(
+            title=" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).capitalize(),
+            authors=[Author(name=f"{rng.choice('ABCDEFGH')}. {rng.choice(WORDS).capitalize()}") for _ in range(rng.randint(1, 8))],
+            year=rng.randint(1990, 2025),
+            journal=rng.choice(["Nature", "Science", "PNAS", "arXiv", None]),
+            volume=str(rng.randint(1, 300)),
+            issue=str(rng.randint(1, 12)),
+            pages=f"{rng.randint(1, 500)}-{rng.randint(501, 900)}",
+            doi=f"10.1000/{seed}.{i}" if rng.random() < 0.7 else None,
+        ))
+    papers = []
+    for api in ("Crossref", "OpenAlex", "Semantic Scholar", "arXiv", "CORE"):
+        for record in rng.sample(base, k=size // 5):
+            papers.append(ScholarlyPaper(
+                sources=[PaperSource(url=f"https://example.org/{api}/{record['doi'] or record['title'][:20]}", label="Publisher Page", access_type="paywalled")],
+                source_api=api,
+                citation_count=rng.randint(0, 5000),
+                **record,
+            ))
+    return papers
+
+def _process(seed: int) -> int:
+    from main import process_results, render_results
+    from services.projection import CITATION_FIELDS
+    return len(render_results(process_results(synthetic_result_set(seed), "deep learning"), CITATION_FIELDS))
+
+def cpu_throughput(workers: int, batches: int) -> float:
+    """Result sets post-processed per second with the given number of worker processes."""
+    with multiprocessing.Pool(workers) as pool:
+        pool.map(_process, range(workers))  # import main in every worker first
+        start = time.perf_counter()
+        pool.map(_process, range(batches), chunksize=1)
+        return batches / (time.perf_counter() - start)
+
+def _drain_bucket(args) -> int:
+    rate, burst, duration = args
+    from services.shared_store import store
+    taken = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        wait = store.take_token("load-test", rate, burst)
+        if wait == 0:
+            taken += 1
+        else:
+            time.sleep(min(wait, max(0.0, deadline - time.time())))
+    return taken
+
+def shared_rate_limit(workers: int, rate: float = 20.0, burst: int = 5, duration: float = 2.0):
+    """Tokens all workers obtained together versus what the single global budget allows."""
+    with multiprocessing.Pool(workers) as pool:
+        taken = sum(pool.map(_drain_bucket, [(rate, burst, duration)] * workers))
+    return taken, rate * duration + burst
+
+async def http_load(url: str, concurrency: int, duration: float):
+    import httpx
+    queries = [" ".join(random.sample(WORDS, 2)) for _ in range(50)]
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(f"{url}/search", params={"q": random.choice(queries)})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} ok, {errors} errors in {elapsed:.1f}s -> {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(f"latency p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--url")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(http_load(args.url.rstrip("/"), args.concurrency, args.duration))
+        return
+
+    # Keep the benchmark's buckets out of the deployment's store
+    os.environ.setdefault("SHARED_STORE_PATH", os.path.join(tempfile.mkdtemp(), "load-test.sqlite3"))
+    print(f"CPU cores available: {os.cpu_count()}")
+    baseline = None
+    for workers in args.workers:
+        throughput = cpu_throughput(workers, args.batches)
+        baseline = baseline or throughput
+        taken, allowed = shared_rate_limit(workers)
+        print(
+            f"workers={workers}: {throughput:7.1f} result sets/s (x{throughput / baseline:.2f}); "
+            f"shared rate limit granted {taken} of {allowed:.0f} allowed"
+        )
+
+if __name__ == "__main__":
+    main()
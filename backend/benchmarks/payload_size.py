@@ -0,0 +1,63 @@
+"""
+Payload size and serialization cost of /search responses per projection.
+
+For each mode it times the work done after the upstream fan-out (citation
+rendering for the requested fields plus JSON serialization) and reports the
+body size raw and compressed as the server would send it:
+
+    python -m benchmarks.payload_size
+    python -m benchmarks.payload_size --papers 100 --repeat 50
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import synthetic_result_set
+
+MODES = {
+    "full": {"view": "full"},
+    "list": {"view": "list"},
+    "fields=title,doi,year": {"fields": "title,doi,year"},
+}
+
+def measure(papers: int, repeat: int, **params):
+    from main import process_results, render_results
+    from models import SearchResponse
+    from services.projection import CITATION_FIELDS, dump_response, select_fields
+
+    fields = select_fields(**params)
+    timings = []
+    for seed in range(repeat):
+        # Fresh papers every round: rendered citations would otherwise be reused
+        ranked = process_results(synthetic_result_set(seed, papers), "deep learning")
+        start = time.perf_counter()
+        if fields & CITATION_FIELDS:
+            render_results(ranked, fields & CITATION_FIELDS)
+        body = dump_response(SearchResponse(results=ranked, total_found=len(ranked), query="deep learning", fields=fields))
+        timings.append((time.perf_counter() - start) * 1000)
+    return body, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=50, help="upstream results per search before dedup")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    print(f"{'mode':<24}{'raw KB':>10}{'gzip KB':>10}{'br KB':>10}{'render+dump ms':>16}")
+    for name, params in MODES.items():
+        body, ms = measure(args.papers, args.repeat, **params)
+        br = f"{len(brotli.compress(body)) / 1024:10.1f}" if brotli else f"{'n/a':>10}"
+        print(f"{name:<24}{len(body) / 1024:10.1f}{len(gzip.compress(body)) / 1024:10.1f}{br}{ms:16.2f}")
+
+if __name__ == "__main__":
+    main()
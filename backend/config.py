@@ -0,0 +1,91 @@
+import os
+import tempfile
+from typing import Literal
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class Settings(BaseSettings):
+    """Runtime configuration, overridable through environment variables or a .env file."""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # HTTP caching of /search and /search/authors responses
+    cache_max_age: int = 300
+    cache_stale_while_revalidate: int = 3600
+    response_cache_size: int = 512
+    compression_min_size: int = 1024
+    # Ranked papers per query, shared by the ?view=/?fields= variants of one search
+    result_set_ttl: float = 60.0
+
+    # Admission control for requests that fan out upstream (cache misses); per worker
+    admission_max_concurrent: int = 16
+    admission_per_client: int = 4
+    admission_queue_size: int = 64
+    admission_queue_timeout: float = 5.0
+    # Proxies in front of the app that append to X-Forwarded-For (Render has one);
+    # the client is the address the outermost of them saw. 0 ignores the header.
+    trusted_proxy_hops: int = 1
+
+    # Paged result sessions (/search/session): idle expiry, count and size bounds,
+    # and how many results each adapter is asked for per upstream page
+    session_ttl: float = 900.0
+    session_max: int = 200
+    session_max_papers: int = 500
+    session_upstream_page: int = 10
+
+    # Multi-worker deployments; uvicorn also reads WEB_CONCURRENCY itself
+    web_concurrency: int = 1
+    # SQLite file holding cache entries and rate-limit buckets shared by all workers
+    shared_store_path: str = os.path.join(tempfile.gettempdir(), "scholarly-shared.sqlite3")
+    # How often expired rows are deleted from the shared store
+    store_purge_interval: float = 600.0
+    # Longest a request waits for an upstream's shared rate-limit budget
+    rate_limit_max_wait: float = 3.0
+
+    # Snapshot of in-memory indexes and cached entries, written periodically and on
+    # shutdown and restored after startup; put it on a persistent disk to survive redeploys
+    snapshot_enabled: bool = True
+    snapshot_path: str = os.path.join(tempfile.gettempdir(), "scholarly-snapshot.bin")
+    snapshot_interval: float = 600.0
+
+    # Upstream failures: retries of transient errors (timeouts, 429, 5xx) and the
+    # last good per-source results kept to stand in when a source fails (the
+    # oldest are trimmed beyond source_stale_max_entries at each store purge)
+    upstream_retries: int = 1
+    upstream_retry_backoff: float = 0.5
+    source_stale_ttl: int = 86400
+    source_stale_max_entries: int = 5000
+    # Browser cache lifetime of responses with a failed or stale source
+    degraded_cache_max_age: int = 30
+
+    # Where search post-processing runs: "thread", "process" or "inline" (on the event loop)
+    postprocess_executor: Literal["thread", "process", "inline"] = "thread"
+    postprocess_workers: int = 2
+
+    # Open-access enrichment and link-health probing
+    link_probe_concurrency: int = 10
+    link_probe_timeout: float = 3.0
+    # How long a search waits for probes; unfinished ones keep filling the cache
+    link_probe_budget: float = 1.5
+    link_health_ttl: int = 86400
+    dead_link_ttl: int = 3600
+    oa_index_ttl: int = 30 * 86400
+
+    # Background refresh of popular cached responses
+    refresh_enabled: bool = True
+    refresh_interval: float = 30.0
+    # Refresh entries expiring within this many seconds
+    refresh_ahead: float = 120.0
+    refresh_top_n: int = 20
+    refresh_min_score: float = 3.0
+    refresh_half_life: float = 1800.0
+    refresh_max_tracked: int = 2000
+    # Share of each upstream's burst that background refresh leaves for live traffic
+    refresh_reserve_ratio: float = 0.5
+
+    # Entries (titles, authors, venues) kept in the /suggest index
+    suggest_max_entries: int = 50000
+
+    # Citation-graph cache for /papers/{id}/references and /papers/{id}/citations
+    graph_max_nodes: int = 20000
+    graph_citations_ttl: float = 86400.0
+
+settings = Settings()
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Tests never share the default shared-store and snapshot files with a local server
+_test_dir = tempfile.mkdtemp(prefix="scholarly-tests-")
+os.environ["SHARED_STORE_PATH"] = os.path.join(_test_dir, "shared.sqlite3")
+os.environ["SNAPSHOT_PATH"] = os.path.join(_test_dir, "snapshot.bin")
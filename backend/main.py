@@ -1,16 +1,81 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import asyncio
-from typing import List, Dict, Set, Optional
-from models import SearchResponse, ScholarlyPaper, PaperSource, Author, Researcher, AuthorSearchResponse
-from adapters.crossref import CrossrefAdapter
-from adapters.openalex import OpenAlexAdapter
-from adapters.semanticscholar import SemanticScholarAdapter
-from adapters.arxiv import ArxivAdapter
-from adapters.core import CoreAdapter
-from services.citation_service import generate_bibtex, generate_ris
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import List, Dict, Set, Optional, FrozenSet, Tuple
+from cachetools import TTLCache
+from models import SearchResponse, ScholarlyPaper, PaperSource, Author, Researcher, AuthorSearchResponse, Suggestion, SuggestResponse, GraphResponse, SourceOutcome, SearchPage
+from config import settings
+from services.http_cache import CachedPayload, get_payload, put_payload
+from services.shared_store import store, background_budget, purge_periodically
+from services.metrics import metrics, monitor_event_loop_lag
+from services.executor import run_cpu_bound, shutdown_executor
+from services.open_access import enrich_open_access
+from services.refresh import refresher
+from services.query import NormalizedQuery, normalize_query
+from services.suggest import suggest_index
+from services.projection import CITATION_FIELDS, ALL_FIELDS, select_fields, cache_suffix, dump_response
+from services.outcomes import call_source, is_degraded, skipped
+from services.results import deduplicate_results, boost_relevance, rank_key
+from services.sessions import ResultSession, sessions
+from services.admission import Overloaded, admission, client_id
+from services.snapshot import snapshots
 
-app = FastAPI(title="Universal Scholarly Search API")
+# Adapters (and httpx) and the citation engine are imported lazily so the
+# process binds its port quickly after a scale-to-zero spin-up; warm_up()
+# loads them in the background straight after startup.
+_adapters = None
+
+def get_adapters() -> list:
+    global _adapters
+    if _adapters is None:
+        from adapters.crossref import CrossrefAdapter
+        from adapters.openalex import OpenAlexAdapter
+        from adapters.semanticscholar import SemanticScholarAdapter
+        from adapters.arxiv import ArxivAdapter
+        from adapters.core import CoreAdapter
+        _adapters = [
+            CrossrefAdapter(),
+            OpenAlexAdapter(),
+            SemanticScholarAdapter(),
+            ArxivAdapter(),
+            CoreAdapter()
+        ]
+    return _adapters
+
+async def warm_up():
+    """Imports the lazy modules, pre-opens pooled upstream connections and restores the last snapshot."""
+    adapters = get_adapters()
+    import services.citation_service  # noqa: F401
+    await store.run(store.purge_expired)
+    restore = [snapshots.restore()] if settings.snapshot_enabled else []
+    await asyncio.gather(*restore, *(adapter.warm_up() for adapter in adapters), return_exceptions=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_task = asyncio.create_task(warm_up())
+    lag_task = asyncio.create_task(monitor_event_loop_lag())
+    purge_task = asyncio.create_task(purge_periodically())
+    refresh_task = asyncio.create_task(refresher.run()) if settings.refresh_enabled else None
+    snapshot_task = asyncio.create_task(snapshots.run()) if settings.snapshot_enabled else None
+    yield
+    warm_task.cancel()
+    lag_task.cancel()
+    purge_task.cancel()
+    if refresh_task:
+        refresh_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+        await snapshots.save_on_shutdown()
+    shutdown_executor()
+    if _adapters is not None:
+        from adapters.base import close_client
+        await close_client()
+
+app = FastAPI(title="Universal Scholarly Search API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,65 +84,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(Overloaded)
+async def shed_request(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers={"Retry-After": str(exc.retry_after)})
+
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "Scholarly Search API is running"}
 
-adapters = [
-    CrossrefAdapter(),
-    OpenAlexAdapter(),
-    SemanticScholarAdapter(),
-    ArxivAdapter(),
-    CoreAdapter()
-]
-
-def get_dedup_key(paper: ScholarlyPaper) -> str:
-    """Fallback key: title + year + first author last name."""
-    title_clean = "".join(filter(str.isalnum, paper.title.lower()))
-    year = str(paper.year) if paper.year else ""
-    author = paper.authors[0].name.split()[-1].lower() if paper.authors else ""
-    return f"{title_clean}|{year}|{author}"
-
-def deduplicate_results(results: List[ScholarlyPaper]) -> List[ScholarlyPaper]:
-    """
-    Deduplicate papers based on DOI, then title+year+author.
-    Merges sources for duplicate records.
-    """
-    by_doi: Dict[str, ScholarlyPaper] = {}
-    by_fallback: Dict[str, ScholarlyPaper] = {}
-    
-    for paper in results:
-        # 1. Identify best key
-        doi = paper.doi.lower() if paper.doi else None
-        fallback_key = get_dedup_key(paper)
-        
-        # 2. Match existing
-        existing = by_doi.get(doi) if doi else by_fallback.get(fallback_key)
-        
-        if existing:
-            # Merge sources
-            existing_urls = {s.url for s in existing.sources}
-            for new_source in paper.sources:
-                if new_source.url not in existing_urls:
-                    existing.sources.append(new_source)
-            
-            # Update missing metadata
-            if paper.citation_count > (existing.citation_count or 0):
-                existing.citation_count = paper.citation_count
-            if not existing.year and paper.year:
-                existing.year = paper.year
-            if not existing.journal and paper.journal:
-                existing.journal = paper.journal
-            if not existing.doi and paper.doi:
-                existing.doi = paper.doi
-        else:
-            # Add new record
-            if doi:
-                by_doi[doi] = paper
-            else:
-                by_fallback[fallback_key] = paper
-    
-    return list(by_doi.values()) + list(by_fallback.values())
+@app.get("/metrics")
+async def get_metrics():
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+    served = counters.get("cache_hit", 0) + counters.get("coalesced", 0)
+    lookups = served + counters.get("cache_miss", 0)
+    # Coalesced requests count as hits: they caused no upstream traffic of their own
+    snapshot["cache_hit_rate"] = served / lookups if lookups else None
+    snapshot["admission"] = {"active": admission.active, "queued": admission.queued}
+    return snapshot
 
 def deduplicate_authors(authors: List[Researcher]) -> List[Researcher]:
     """Deduplicate authors based on name and affiliation."""
@@ -99,65 +123,315 @@ def deduplicate_authors(authors: List[Researcher]) -> List[Researcher]:
             
     return list(unique.values())
 
-from services.citation_service import generate_bibtex, generate_ris, format_all_citations
-
-@app.get("/search", response_model=SearchResponse)
-async def search(q: str = Query(..., min_length=1)):
-    tasks = [adapter.search(q) for adapter in adapters]
-    all_results = await asyncio.gather(*tasks)
-    flattened_results = [paper for sublist in all_results for paper in sublist]
-    
+def process_results(flattened_results: List[ScholarlyPaper], q: str) -> List[ScholarlyPaper]:
+    """CPU-bound post-processing of a search: dedup and ranking."""
     deduplicated = deduplicate_results(flattened_results)
     
-    for paper in deduplicated:
-        paper.bibtex = generate_bibtex(paper)
-        paper.ris = generate_ris(paper)
-        format_all_citations(paper)
-    
-    # Calculate a local relevance boost based on the query
     q_lower = q.lower()
     for paper in deduplicated:
-        title_lower = paper.title.lower()
-        match_score = 0
-        if title_lower == q_lower:
-            match_score = 100 # Exact match
-        elif title_lower.startswith(q_lower):
-            match_score = 50 # Starts with query
-        elif q_lower in title_lower:
-            match_score = 25 # Contains query
-            
-        paper.relevance_score = (paper.relevance_score or 0) + match_score
-
-    deduplicated.sort(key=lambda x: (
-        x.relevance_score or 0,
-        x.citation_count or 0,
-        1 if x.doi else 0,
-        x.year or 0
-    ), reverse=True)
+        boost_relevance(paper, q_lower)
+
+    deduplicated.sort(key=rank_key, reverse=True)
+    return deduplicated
+
+def render_results(papers: List[ScholarlyPaper], fields: FrozenSet[str]) -> List[ScholarlyPaper]:
+    """Renders only the requested citation formats; papers keep them for later requests."""
+    from services.citation_service import render_citations
+
+    for paper in papers:
+        render_citations(paper, fields)
+    return papers
+
+# Ranked papers by canonical query key, so a list view followed by a full view
+# of the same search costs one upstream fan-out.
+_result_sets: TTLCache = TTLCache(maxsize=settings.response_cache_size, ttl=settings.result_set_ttl)
+
+async def fan_out(kind: str, query: NormalizedQuery) -> Tuple[list, List[SourceOutcome]]:
+    """Queries every adapter concurrently; a failing source degrades the response instead of emptying it."""
+    outcomes: List[SourceOutcome] = []
+    pending = []  # (position in outcomes, call)
+    for adapter in get_adapters():
+        call = None
+        if kind == "search":
+            upstream_query = adapter.rewrite_query(query)
+            if upstream_query:
+                call = partial(adapter.search, upstream_query)
+        elif adapter.supports_authors:
+            call = partial(adapter.search_authors, query.text)
+        if call is not None:
+            pending.append((len(outcomes), call_source(adapter.name, kind, query.key, call)))
+        outcomes.append(skipped(adapter.name))
+
+    results = []
+    completed = await asyncio.gather(*(call for _, call in pending))
+    for (position, _), (source_results, outcome) in zip(pending, completed):
+        outcomes[position] = outcome
+        results.extend(source_results)
+    return results, outcomes
+
+async def search_papers(query: NormalizedQuery) -> Tuple[List[ScholarlyPaper], List[SourceOutcome]]:
+    cached = _result_sets.get(query.key)
+    if cached is not None:
+        return cached
+
+    flattened_results, outcomes = await fan_out("search", query)
+    
+    # One executor task per result set keeps the event loop free for other requests
+    start = time.perf_counter()
+    papers = await run_cpu_bound(process_results, flattened_results, query.text)
+    metrics.observe("postprocess", (time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await enrich_open_access(papers)
+    metrics.observe("oa_enrichment", (time.perf_counter() - start) * 1000)
+
+    suggest_index.add_papers(papers)
+    # Background refreshes may be throttled part-way; only live results are shared.
+    # Degraded sets are shared too, so a failing upstream isn't hit again on every request.
+    if papers and background_budget.get() is None:
+        _result_sets[query.key] = (papers, outcomes)
+    return papers, outcomes
+
+async def run_search(query: NormalizedQuery, fields: FrozenSet[str] = ALL_FIELDS) -> SearchResponse:
+    papers, outcomes = await search_papers(query)
+    if fields & CITATION_FIELDS:
+        start = time.perf_counter()
+        papers = await run_cpu_bound(render_results, papers, fields & CITATION_FIELDS)
+        metrics.observe("citation_rendering", (time.perf_counter() - start) * 1000)
     
     return SearchResponse(
-        results=deduplicated,
-        total_found=len(deduplicated),
-        query=q
+        results=papers,
+        total_found=len(papers),
+        query=query.text,
+        source_outcomes=outcomes,
+        fields=fields
     )
 
-@app.get("/search/authors", response_model=AuthorSearchResponse)
-async def search_authors(q: str = Query(..., min_length=1)):
-    tasks = [adapter.search_authors(q) for adapter in adapters]
-    all_results = await asyncio.gather(*tasks)
-    flattened_results = [author for sublist in all_results for author in sublist]
+async def run_author_search(query: NormalizedQuery) -> AuthorSearchResponse:
+    flattened_results, outcomes = await fan_out("authors", query)
     
     deduplicated = deduplicate_authors(flattened_results)
     
     # Sort by impact (citation count or h-index)
     deduplicated.sort(key=lambda x: (x.citation_count or 0, x.h_index or 0), reverse=True)
+
+    suggest_index.add_researchers(deduplicated)
     
     return AuthorSearchResponse(
         results=deduplicated,
         total_found=len(deduplicated),
+        query=query.text,
+        source_outcomes=outcomes
+    )
+
+# Cache misses currently being computed, by canonical key; identical concurrent
+# requests await the same computation instead of fanning out upstream again.
+_inflight: Dict[str, asyncio.Task] = {}
+
+async def compute_payload(key: str, compute) -> CachedPayload:
+    with refresher.live():
+        result = await compute()
+    # Empty or degraded result sets mean upstream trouble; don't pin them for a TTL.
+    if is_degraded(getattr(result, "source_outcomes", [])):
+        return CachedPayload(dump_response(result), max_age=settings.degraded_cache_max_age)
+    payload = CachedPayload(dump_response(result))
+    if result.results:
+        await put_payload(key, payload)
+    return payload
+
+async def cached_response(request: Request, key: str, compute) -> Response:
+    """
+    Serves a serialized response from the cache, computing and storing it on a miss.
+    Cache hits and requests joining an in-flight computation are served straight
+    away; only a request that starts an upstream fan-out goes through admission control.
+    """
+    refresher.track(key, compute)
+    payload = await get_payload(key)
+    if payload is None and key not in _inflight:
+        ticket = await admission.acquire(client_id(request))
+        # Another request may have started or finished the same work while this one queued
+        payload = await get_payload(key)
+        if payload is None and key not in _inflight:
+            metrics.incr("cache_miss")
+            task = asyncio.create_task(compute_payload(key, compute))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+            task.add_done_callback(lambda _: admission.release(ticket))
+            # Shielded so one client disconnecting doesn't cancel the others' result
+            return (await asyncio.shield(task)).to_response(request)
+        admission.release(ticket)
+    if payload is not None:
+        metrics.incr("cache_hit")
+        return payload.to_response(request)
+    metrics.incr("coalesced")
+    return (await asyncio.shield(_inflight[key])).to_response(request)
+
+def projection(view: str, fields: Optional[str]) -> FrozenSet[str]:
+    try:
+        return select_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    view: str = Query("full", description="'list' leaves out citation strings; 'full' includes everything"),
+    fields: Optional[str] = Query(None, description="Comma-separated paper fields; overrides view"),
+):
+    query = normalize_query(q)
+    selected = projection(view, fields)
+    return await cached_response(
+        request, f"search:{query.key}{cache_suffix(selected)}", lambda: run_search(query, selected)
+    )
+
+async def fetch_session_round(session: ResultSession):
+    """Fetches the next page from every adapter still paging and merges it into the session."""
+    size = settings.session_upstream_page
+    adapters = {adapter.name: adapter for adapter in get_adapters()}
+    names = list(session.offsets)
+    calls = []
+    for name in names:
+        adapter, offset = adapters[name], session.offsets[name]
+        search_page = partial(adapter.search, adapter.rewrite_query(session.query), size, offset)
+        # Only first pages keep a stale fallback (shared with /search); one per offset isn't worth the rows
+        calls.append(call_source(name, "search", session.query.key if offset == 0 else None, search_page))
+    with refresher.live():
+        completed = await asyncio.gather(*calls)
+    for name, (results, outcome) in zip(names, completed):
+        session.record_page(name, size, results, outcome)
+
+@app.get("/search/session", response_model=SearchPage)
+async def search_session(
+    request: Request,
+    q: Optional[str] = Query(None, min_length=1),
+    token: Optional[str] = Query(None, description="Session token from a previous page"),
+    size: int = Query(10, ge=1, le=50),
+    view: str = Query("full"),
+    fields: Optional[str] = Query(None),
+):
+    """
+    Pages through a search without re-running it: the first call (with q) opens
+    a session, later calls (with token) return the next-best results not yet seen.
+    """
+    selected = projection(view, fields)
+    if token:
+        session = sessions.get(token)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session token")
+    elif q:
+        # Stored only once admitted, so shed requests never evict live sessions
+        session = sessions.new(normalize_query(q))
+        for adapter in get_adapters():
+            if adapter.rewrite_query(session.query):
+                session.offsets[adapter.name] = 0
+            else:
+                session.outcomes[adapter.name] = skipped(adapter.name)
+    else:
+        raise HTTPException(status_code=422, detail="Either q or token is required")
+
+    async with session.lock:
+        if session.pending < size and session.can_fetch:
+            async with admission.admitted(client_id(request)):
+                while session.pending < size and session.can_fetch:
+                    await fetch_session_round(session)
+        page = session.take(size)
+        page_number = session.pages
+    if not token:
+        sessions.add(session)
+    if selected & CITATION_FIELDS:
+        page = await run_cpu_bound(render_results, page, selected & CITATION_FIELDS)
+    await enrich_open_access(page)
+    suggest_index.add_papers(page)
+
+    result = SearchPage(
+        token=session.token,
+        query=session.query.text,
+        page=page_number,
+        results=page,
+        has_more=session.has_more,
+        total_found=len(session.index),
+        source_outcomes=list(session.outcomes.values()),
+        fields=selected
+    )
+    # Sessions are stateful, so pages must not be reused from any cache
+    return Response(content=dump_response(result), media_type="application/json", headers={"Cache-Control": "no-store"})
+
+@app.get("/search/authors", response_model=AuthorSearchResponse)
+async def search_authors(request: Request, q: str = Query(..., min_length=1)):
+    query = normalize_query(q)
+    return await cached_response(request, f"authors:{query.key}", lambda: run_author_search(query))
+
+async def run_graph(paper_id: str, relation: str, limit: int, fields: FrozenSet[str] = ALL_FIELDS) -> GraphResponse:
+    from services.graph import neighbours, GraphError
+
+    try:
+        node_id, papers = await neighbours(paper_id, relation, limit)
+    except GraphError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    # Graph nodes are cached, so citations rendered once are reused on later hops
+    if fields & CITATION_FIELDS:
+        papers = await run_cpu_bound(render_results, papers, fields & CITATION_FIELDS)
+    return GraphResponse(paper_id=node_id, relation=relation, results=papers, total_found=len(papers), fields=fields)
+
+def check_paper_id(paper_id: str):
+    from services.graph import is_valid_paper_id
+
+    # Anything else would end up pasted into an upstream URL path
+    if not is_valid_paper_id(paper_id):
+        raise HTTPException(
+            status_code=422,
+            detail="paper_id must be an OpenAlex work ID, a DOI, an arXiv ID or a Semantic Scholar paperId/CorpusId",
+        )
+
+# {paper_id} is an OpenAlex work ID (W...), a DOI (slashes allowed), an arXiv ID or a Semantic Scholar ID
+@app.get("/papers/{paper_id:path}/references", response_model=GraphResponse)
+async def paper_references(
+    request: Request,
+    paper_id: str = Path(...),
+    limit: int = Query(25, ge=1, le=100),
+    view: str = Query("full"),
+    fields: Optional[str] = Query(None),
+):
+    check_paper_id(paper_id)
+    selected = projection(view, fields)
+    key = f"references:{paper_id.lower()}:{limit}{cache_suffix(selected)}"
+    return await cached_response(request, key, lambda: run_graph(paper_id, "references", limit, selected))
+
+@app.get("/papers/{paper_id:path}/citations", response_model=GraphResponse)
+async def paper_citations(
+    request: Request,
+    paper_id: str = Path(...),
+    limit: int = Query(25, ge=1, le=100),
+    view: str = Query("full"),
+    fields: Optional[str] = Query(None),
+):
+    check_paper_id(paper_id)
+    selected = projection(view, fields)
+    key = f"citations:{paper_id.lower()}:{limit}{cache_suffix(selected)}"
+    return await cached_response(request, key, lambda: run_graph(paper_id, "citations", limit, selected))
+
+@app.post("/citations", response_model=ScholarlyPaper)
+async def render_paper_citations(paper: ScholarlyPaper):
+    """Renders citation strings for a paper the client already has; no upstream calls."""
+    rendered = await run_cpu_bound(render_results, [paper], CITATION_FIELDS)
+    return rendered[0]
+
+@app.get("/suggest", response_model=SuggestResponse)
+async def suggest(q: str = Query(..., min_length=1), limit: int = Query(8, ge=1, le=20)):
+    """Autocomplete from the local index only; never calls upstream APIs."""
+    start = time.perf_counter()
+    entries = suggest_index.suggest(q, limit)
+    metrics.observe("suggest", (time.perf_counter() - start) * 1000)
+    return SuggestResponse(
+        suggestions=[Suggestion(text=entry.text, kind=entry.kind) for entry in entries],
         query=q
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=10000)
+    if settings.web_concurrency > 1:
+        # Workers share the response cache and upstream rate limits through services.shared_store
+        uvicorn.run("main:app", host="0.0.0.0", port=10000, workers=settings.web_concurrency)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=10000)
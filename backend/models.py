@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, FrozenSet
 
 class Author(BaseModel):
     name: str
@@ -8,6 +8,7 @@ class PaperSource(BaseModel):
     url: str
     label: str  # "Publisher Page", "Open Access PDF", "Repository Version", "Preprint"
     access_type: str # "oa", "paywalled", "repository", "preprint", "canonical"
+    reachable: Optional[bool] = None # Result of the last link-health probe, if any
 
 class ScholarlyPaper(BaseModel):
     title: str
@@ -19,7 +20,9 @@ class ScholarlyPaper(BaseModel):
     pages: Optional[str] = None
     doi: Optional[str] = None
     sources: List[PaperSource] = []
+    best_oa_url: Optional[str] = None # Best verified open-access copy
     source_api: str # The API that first discovered this record
+    openalex_id: Optional[str] = None # e.g. "W2741809807"; usable with /papers/{id}/...
     citation_count: Optional[int] = 0
     relevance_score: Optional[float] = 0.0
     bibtex: Optional[str] = None
@@ -36,12 +39,49 @@ class Researcher(BaseModel):
     url: Optional[str] = None
     source: str
 
+class SourceOutcome(BaseModel):
+    source: str
+    status: str = "ok" # "ok", "skipped", "timeout", "rate_limited", "http_error", "parse_error"
+    latency_ms: float = 0.0
+    retries: int = 0
+    result_count: int = 0
+    stale: bool = False # Results are the source's last good response for this query
+    error: Optional[str] = None
+
 class AuthorSearchResponse(BaseModel):
     results: List[Researcher]
     total_found: int
     query: str
+    source_outcomes: List[SourceOutcome] = []
 
 class SearchResponse(BaseModel):
     results: List[ScholarlyPaper]
     total_found: int
     query: str
+    source_outcomes: List[SourceOutcome] = []
+    fields: Optional[FrozenSet[str]] = Field(default=None, exclude=True) # Paper fields to serialize; None for all
+
+class SearchPage(BaseModel):
+    token: str # Pass back as ?token= for the next page
+    query: str
+    page: int
+    results: List[ScholarlyPaper]
+    has_more: bool
+    total_found: int # Distinct papers merged into the session so far
+    source_outcomes: List[SourceOutcome] = []
+    fields: Optional[FrozenSet[str]] = Field(default=None, exclude=True)
+
+class GraphResponse(BaseModel):
+    paper_id: str
+    relation: str # "references" or "citations"
+    results: List[ScholarlyPaper]
+    total_found: int
+    fields: Optional[FrozenSet[str]] = Field(default=None, exclude=True)
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str # "title", "author", "venue"
+
+class SuggestResponse(BaseModel):
+    suggestions: List[Suggestion]
+    query: str
@@ -0,0 +1,140 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+from config import settings
+from services.metrics import metrics
+
+def client_id(request) -> str:
+    """
+    The caller's address for per-client limits. Clients can put anything in
+    X-Forwarded-For, so only the entries our own proxies appended are trusted.
+    """
+    peer = request.client.host if request.client else "unknown"
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if settings.trusted_proxy_hops <= 0 or not hops:
+        return peer
+    return hops[-min(settings.trusted_proxy_hops, len(hops))]
+
+class Overloaded(Exception):
+    """A request shed by admission control; maps to 429 (client limit) or 503 (server saturated)."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+class Ticket:
+    __slots__ = ("client", "admitted_at")
+
+    def __init__(self, client: str):
+        self.client = client
+        self.admitted_at = time.monotonic()
+
+class AdmissionController:
+    """
+    Caps requests that fan out upstream: at most `max_concurrent` run at once
+    and at most `per_client` per client (running or queued). Others wait in a
+    FIFO queue of `max_queue` for up to `queue_timeout` seconds and are shed
+    with a Retry-After hint beyond that. Cache hits never come through here.
+    """
+
+    def __init__(self, max_concurrent: int, per_client: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.per_client = per_client
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._clients: Dict[str, int] = {}
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long an admitted request holds its slot, for Retry-After
+        self._hold_time = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._hold_time * (self.queued + 1) / self.max_concurrent))
+
+    async def acquire(self, client: str) -> Ticket:
+        if self._clients.get(client, 0) >= self.per_client:
+            metrics.incr("shed_client_limit")
+            raise Overloaded(429, self.retry_after(), "Too many concurrent searches from this client")
+        self._clients[client] = self._clients.get(client, 0) + 1
+        start = time.perf_counter()
+        try:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+            else:
+                await self._wait_for_slot()
+        except BaseException:
+            self._release_client(client)
+            raise
+        metrics.observe("admission_wait", (time.perf_counter() - start) * 1000)
+        return Ticket(client)
+
+    async def _wait_for_slot(self):
+        if len(self._waiters) >= self.max_queue:
+            metrics.incr("shed_queue_full")
+            raise Overloaded(503, self.retry_after(), "Server is busy, please retry shortly")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # asyncio.wait leaves the future alone on timeout, so a slot handed
+            # over at the last moment is still seen below
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            metrics.incr("shed_queue_timeout")
+            raise Overloaded(503, self.retry_after(), "Server is busy, please retry shortly")
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done():
+            self._release_slot()  # Handed a slot we are not going to use
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self, ticket: Ticket):
+        held = time.monotonic() - ticket.admitted_at
+        self._hold_time = 0.8 * self._hold_time + 0.2 * held
+        self._release_client(ticket.client)
+        self._release_slot()
+
+    def _release_client(self, client: str):
+        remaining = self._clients.get(client, 0) - 1
+        if remaining > 0:
+            self._clients[client] = remaining
+        else:
+            self._clients.pop(client, None)
+
+    def _release_slot(self):
+        # Hand the slot straight to the oldest waiter, so newcomers can't jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admitted(self, client: str):
+        ticket = await self.acquire(client)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+admission = AdmissionController(
+    settings.admission_max_concurrent,
+    settings.admission_per_client,
+    settings.admission_queue_size,
+    settings.admission_queue_timeout,
+)
@@ -339,3 +339,12 @@ def format_all_citations(paper: ScholarlyPaper):
         "Springer": generate_standard_list(paper),
         "Elsevier": generate_standard_list(paper)
     }
+
+def render_citations(paper: ScholarlyPaper, fields=("bibtex", "ris", "formatted_citations")):
+    """Fills whichever of bibtex, ris and formatted_citations are requested and not yet rendered."""
+    if "bibtex" in fields and paper.bibtex is None:
+        paper.bibtex = generate_bibtex(paper)
+    if "ris" in fields and paper.ris is None:
+        paper.ris = generate_ris(paper)
+    if "formatted_citations" in fields and not paper.formatted_citations:
+        format_all_citations(paper)
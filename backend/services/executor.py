@@ -0,0 +1,32 @@
+import asyncio
+from typing import Callable
+from config import settings
+
+# CPU-bound post-processing (dedup, citation rendering, ranking) runs here so the
+# event loop keeps serving other requests' upstream I/O meanwhile. Callers submit
+# one task per whole result set to keep hand-off overhead per search constant.
+
+_executor = None
+
+def get_executor():
+    global _executor
+    if _executor is None and settings.postprocess_executor != "inline":
+        # Imported on first use; concurrent.futures.process alone is a noticeable share of startup
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        if settings.postprocess_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.postprocess_workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.postprocess_workers, thread_name_prefix="postprocess")
+    return _executor
+
+async def run_cpu_bound(fn: Callable, *args):
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,245 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from models import ScholarlyPaper
+from services.metrics import metrics
+from services.query import extract_arxiv_id
+
+OPENALEX_ID = re.compile(r"^(?:https?://openalex\.org/)?(W\d+)$", re.IGNORECASE)
+DOI_ID = re.compile(r"^(?:doi:|https?://(?:dx\.)?doi\.org/)?(10\.\d{4,9}/\S+)$", re.IGNORECASE)
+# Semantic Scholar's own IDs: a 40-hex paperId or a corpus ID
+S2_ID = re.compile(r"^(?:[0-9a-f]{40}|corpusid:\d+)$", re.IGNORECASE)
+
+def match_doi(paper_id: str) -> Optional[str]:
+    """The DOI in paper_id, unless a "." or ".." segment would change the upstream URL path."""
+    match = DOI_ID.match(paper_id)
+    if not match or {".", ".."} & set(match.group(1).split("/")):
+        return None
+    return match.group(1).lower()
+
+def s2_paper_id(paper_id: str) -> Optional[str]:
+    """paper_id in Semantic Scholar's form (paperId, CorpusId:, DOI:, ARXIV:), or None if it is none of these."""
+    if S2_ID.match(paper_id):
+        return paper_id if ":" not in paper_id else f"CorpusId:{paper_id.split(':', 1)[1]}"
+    doi = match_doi(paper_id)
+    if doi:
+        return f"DOI:{doi}"
+    arxiv_id = extract_arxiv_id(paper_id.lower())
+    if arxiv_id:
+        return f"ARXIV:{arxiv_id}"
+    return None
+
+def is_valid_paper_id(paper_id: str) -> bool:
+    return bool(OPENALEX_ID.match(paper_id)) or s2_paper_id(paper_id) is not None
+
+class GraphError(Exception):
+    """Raised when neither OpenAlex nor Semantic Scholar could resolve a neighbourhood."""
+
+class CitationGraph:
+    """
+    Local cache of citation-graph nodes (papers, keyed by OpenAlex work ID) and edges.
+    Reference lists of a published work don't change, so they are kept for the
+    node's lifetime; citing lists grow and expire after graph_citations_ttl. Nodes
+    are evicted least-recently-used beyond graph_max_nodes, together with their edges.
+    """
+
+    def __init__(self, max_nodes: int, citations_ttl: float):
+        self.max_nodes = max_nodes
+        self.citations_ttl = citations_ttl
+        self._nodes: "OrderedDict[str, ScholarlyPaper]" = OrderedDict()
+        self._references: Dict[str, List[str]] = {}
+        self._citations: Dict[str, Tuple[float, int, List[str]]] = {}  # (fetched_at, limit asked, ids)
+        self._doi_aliases: Dict[str, str] = {}
+        # Neighbourhoods of papers OpenAlex doesn't know, as served by Semantic Scholar
+        self._fallback: Dict[Tuple[str, str], Tuple[float, List[ScholarlyPaper]]] = {}
+
+    def add(self, paper: ScholarlyPaper, references: Optional[List[str]] = None):
+        node_id = paper.openalex_id
+        if not node_id:
+            return
+        self._nodes[node_id] = paper
+        self._nodes.move_to_end(node_id)
+        if references is not None:
+            self._references[node_id] = references
+        if paper.doi:
+            self._doi_aliases[paper.doi.lower()] = node_id
+        while len(self._nodes) > self.max_nodes:
+            evicted, old = self._nodes.popitem(last=False)
+            self._references.pop(evicted, None)
+            self._citations.pop(evicted, None)
+            if old.doi:
+                self._doi_aliases.pop(old.doi.lower(), None)
+
+    def node(self, node_id: str) -> Optional[ScholarlyPaper]:
+        paper = self._nodes.get(node_id)
+        if paper is not None:
+            self._nodes.move_to_end(node_id)
+        return paper
+
+    def alias(self, doi: str) -> Optional[str]:
+        return self._doi_aliases.get(doi.lower())
+
+    def references(self, node_id: str) -> Optional[List[str]]:
+        return self._references.get(node_id)
+
+    def citations(self, node_id: str, limit: int) -> Optional[List[str]]:
+        """Cached citing IDs, if fresh and fetched with a limit covering this one (or exhaustive)."""
+        entry = self._citations.get(node_id)
+        if entry is None or time.monotonic() - entry[0] > self.citations_ttl:
+            return None
+        fetched_at, fetched_limit, citing = entry
+        if fetched_limit < limit and len(citing) >= fetched_limit:
+            return None
+        return citing
+
+    def set_citations(self, node_id: str, limit: int, citing: List[str]):
+        if node_id in self._nodes:
+            self._citations[node_id] = (time.monotonic(), limit, citing)
+
+    def fallback(self, paper_id: str, relation: str) -> Optional[List[ScholarlyPaper]]:
+        entry = self._fallback.get((paper_id, relation))
+        if entry is None or time.monotonic() - entry[0] > self.citations_ttl:
+            return None
+        return entry[1]
+
+    def set_fallback(self, paper_id: str, relation: str, papers: List[ScholarlyPaper]):
+        self._fallback[(paper_id, relation)] = (time.monotonic(), papers)
+        while len(self._fallback) > self.max_nodes // 10:
+            self._fallback.pop(next(iter(self._fallback)))
+
+    def dump(self) -> dict:
+        """
+        Nodes most recently used first, with their edges; timestamps become ages
+        in seconds. Papers are returned as is, to be serialized off the event loop.
+        """
+        now = time.monotonic()
+        nodes = []
+        for node_id in reversed(self._nodes):
+            citations = self._citations.get(node_id)
+            nodes.append([
+                self._nodes[node_id],
+                self._references.get(node_id),
+                [now - citations[0], citations[1], citations[2]] if citations else None,
+            ])
+        fallback = [
+            [paper_id, relation, now - fetched_at, papers]
+            for (paper_id, relation), (fetched_at, papers) in self._fallback.items()
+        ]
+        return {"nodes": nodes, "fallback": fallback}
+
+    def restore(self, nodes: List[tuple], fallback: List[tuple]):
+        """
+        Adds nodes from dump() (papers already validated) that aren't cached yet,
+        as older than anything cached since startup. Expired citing lists are dropped.
+        """
+        now = time.monotonic()
+        for paper, references, citations in nodes:
+            if len(self._nodes) >= self.max_nodes:
+                break
+            node_id = paper.openalex_id
+            if not node_id or node_id in self._nodes:
+                continue
+            self._nodes[node_id] = paper
+            self._nodes.move_to_end(node_id, last=False)
+            if references is not None:
+                self._references[node_id] = references
+            if citations and citations[0] <= self.citations_ttl:
+                self._citations[node_id] = (now - citations[0], citations[1], citations[2])
+            if paper.doi:
+                self._doi_aliases.setdefault(paper.doi.lower(), node_id)
+        for paper_id, relation, age, papers in fallback:
+            if len(self._fallback) >= self.max_nodes // 10:
+                break
+            if age <= self.citations_ttl:
+                self._fallback.setdefault((paper_id, relation), (now - age, papers))
+
+graph = CitationGraph(settings.graph_max_nodes, settings.graph_citations_ttl)
+
+_openalex = None
+_s2 = None
+
+def _adapters():
+    global _openalex, _s2
+    if _openalex is None:
+        from adapters.openalex import OpenAlexAdapter
+        from adapters.semanticscholar import SemanticScholarAdapter
+        _openalex, _s2 = OpenAlexAdapter(), SemanticScholarAdapter()
+    return _openalex, _s2
+
+async def resolve_node(paper_id: str) -> Optional[str]:
+    """OpenAlex work ID for an OpenAlex ID or DOI, fetching (and caching) the node if needed."""
+    openalex, _ = _adapters()
+    match = OPENALEX_ID.match(paper_id)
+    if match:
+        node_id = match.group(1).upper()
+        if graph.node(node_id) is None or graph.references(node_id) is None:
+            graph.add(*await openalex.fetch_work(node_id))
+        return node_id
+    doi = match_doi(paper_id)
+    if doi:
+        node_id = graph.alias(doi)
+        if node_id is None or graph.references(node_id) is None:
+            paper, references = await openalex.fetch_work(f"doi:{doi}")
+            graph.add(paper, references)
+            node_id = paper.openalex_id
+        return node_id
+    return None  # Semantic Scholar paperId, arXiv ID
+
+async def _s2_neighbours(paper_id: str, relation: str, limit: int) -> List[ScholarlyPaper]:
+    _, s2 = _adapters()
+    cached = graph.fallback(paper_id, relation)
+    if cached is not None:
+        return cached[:limit]
+    s2_id = s2_paper_id(paper_id)
+    if s2_id is None:
+        raise GraphError(f"Not a paper ID: {paper_id}")
+    papers = await s2.fetch_neighbours(s2_id, relation, limit)
+    graph.set_fallback(paper_id, relation, papers)
+    return papers
+
+async def neighbours(paper_id: str, relation: str, limit: int) -> Tuple[str, List[ScholarlyPaper]]:
+    """
+    References or citing papers of paper_id, resolved from the graph cache first.
+    Neighbours missing from the cache are fetched in bulk (one call per batch,
+    not per paper), and each fetched node brings its own reference list, so
+    walking further hops mostly needs no upstream calls at all.
+    """
+    openalex, _ = _adapters()
+    try:
+        node_id = await resolve_node(paper_id)
+    except Exception as e:
+        print(f"Graph OpenAlex Error ({paper_id}): {e}")
+        node_id = None
+
+    if node_id is not None:
+        try:
+            if relation == "references":
+                wanted = (graph.references(node_id) or [])[:limit]
+            else:
+                wanted = graph.citations(node_id, limit)
+                if wanted is None:
+                    citing = await openalex.fetch_citing(node_id, limit)
+                    metrics.incr("graph_nodes_fetched", len(citing))
+                    for paper, references in citing:
+                        graph.add(paper, references)
+                    wanted = [paper.openalex_id for paper, _ in citing]
+                    graph.set_citations(node_id, limit, wanted)
+                wanted = wanted[:limit]
+            # Either list may name nodes never fetched or since evicted
+            missing = [n for n in wanted if graph.node(n) is None]
+            if missing:
+                metrics.incr("graph_nodes_fetched", len(missing))
+                for paper, references in await openalex.fetch_works(missing):
+                    graph.add(paper, references)
+            metrics.incr("graph_requests")
+            return node_id, [p for p in (graph.node(n) for n in wanted) if p is not None]
+        except Exception as e:
+            print(f"Graph OpenAlex Error ({node_id}): {e}")
+
+    try:
+        return paper_id, await _s2_neighbours(paper_id, relation, limit)
+    except Exception as e:
+        print(f"Graph Semantic Scholar Error ({paper_id}): {e}")
+        raise GraphError(f"Could not resolve {relation} for {paper_id}")
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Optional
+from fastapi import Request, Response
+from cachetools import TTLCache
+from config import settings
+from services.shared_store import store
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is still offered without it
+    brotli = None
+
+# Per-source diagnostics that differ between otherwise identical responses
+VOLATILE_OUTCOME_FIELDS = ("latency_ms", "retries", "error")
+
+def compute_etag(body: bytes) -> str:
+    """
+    Weak validator over the uncompressed JSON, shared by every encoding of it.
+    Timing and error details of source_outcomes are left out, so a recomputed
+    response with the same results and per-source status keeps its ETag.
+    """
+    if b'"source_outcomes"' in body:
+        data = json.loads(body)
+        if isinstance(data, dict) and isinstance(data.get("source_outcomes"), list):
+            data["source_outcomes"] = [
+                {k: v for k, v in outcome.items() if k not in VOLATILE_OUTCOME_FIELDS}
+                for outcome in data["source_outcomes"]
+            ]
+            body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Codings the client accepts with a non-zero q-value."""
+    codings = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                pass
+        if q > 0:
+            codings.add(name.strip().lower())
+    return codings
+
+class CachedPayload:
+    """A serialized JSON response with its ETag and lazily compressed variants."""
+
+    def __init__(self, body: bytes, max_age: int = None):
+        self.body = body
+        self.max_age = settings.cache_max_age if max_age is None else max_age
+        self.etag = compute_etag(body)
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, coding: str) -> bytes:
+        if coding not in self._encoded:
+            if coding == "br":
+                self._encoded[coding] = brotli.compress(self.body, quality=5)
+            else:
+                self._encoded[coding] = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._encoded[coding]
+
+    def to_response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": (
+                f"public, max-age={self.max_age}, "
+                f"stale-while-revalidate={settings.cache_stale_while_revalidate}"
+            ),
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        if len(body) >= settings.compression_min_size:
+            accepted = accepted_encodings(request.headers.get("accept-encoding"))
+            coding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+            if coding:
+                body = self.encoded(coding)
+                headers["Content-Encoding"] = coding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+# Serialized responses keyed by endpoint and query; repeat queries skip the upstream fan-out.
+# The per-process TTLCache keeps compressed variants hot; the shared store lets
+# every worker reuse a response computed by any other.
+response_cache: TTLCache = TTLCache(maxsize=settings.response_cache_size, ttl=settings.cache_max_age)
+
+async def get_payload(key: str) -> Optional[CachedPayload]:
+    payload = response_cache.get(key)
+    if payload is None:
+        body = await store.run(store.get, f"response:{key}")
+        if body is not None:
+            payload = CachedPayload(body)
+            response_cache[key] = payload
+    return payload
+
+async def put_payload(key: str, payload: CachedPayload):
+    response_cache[key] = payload
+    await store.run(store.set, f"response:{key}", payload.body, settings.cache_max_age)
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict
+
+class Metrics:
+    """In-process counters and timing samples exposed on /metrics."""
+
+    def __init__(self, window: int = 1000):
+        self.counters: Dict[str, int] = {}
+        self.samples: Dict[str, Deque[float]] = {}
+        self.window = window
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+        self.samples[name].append(value)
+
+    def summary(self, name: str) -> Dict[str, float]:
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "p50": values[len(values) // 2],
+            "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+            "max": values[-1],
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timings_ms": {name: self.summary(name) for name in self.samples},
+        }
+
+metrics = Metrics()
+
+async def monitor_event_loop_lag(interval: float = 0.1):
+    """
+    Samples how late the event loop wakes up from a fixed sleep. Sustained lag
+    means synchronous work is blocking every other request's I/O.
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        metrics.observe("event_loop_lag", max(0.0, lag) * 1000)
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from cachetools import TTLCache
+from config import settings
+from models import ScholarlyPaper
+from services.metrics import metrics
+from services.shared_store import store
+
+# Candidate OA links probed per paper; the rest are only used if already known healthy.
+MAX_PROBES_PER_PAPER = 2
+
+class OALocationIndex:
+    """
+    Local stand-in for an Unpaywall-style DOI -> best OA location lookup.
+    Filled from the verified OA copies upstreams report (OpenAlex locations,
+    S2 openAccessPdf, CORE, arXiv) and shared by all workers, so a DOI found
+    open once stays resolvable when later searches only surface its publisher page.
+    """
+
+    async def lookup_many(self, dois: Iterable[str]) -> Dict[str, str]:
+        """Indexed OA URL per lowercased DOI, for the DOIs the index knows."""
+        keys = [f"oa:{doi}" for doi in {doi.lower() for doi in dois}]
+        found = await store.run(store.get_many, keys) if keys else {}
+        return {key[len("oa:"):]: value.decode() for key, value in found.items()}
+
+    async def record_many(self, locations: Dict[str, str]):
+        if locations:
+            items = {f"oa:{doi.lower()}": url.encode() for doi, url in locations.items()}
+            await store.run(store.set_many, items, settings.oa_index_ttl)
+
+class LinkHealthChecker:
+    """HEAD-probes links under a bounded semaphore and caches the outcome per URL."""
+
+    def __init__(self):
+        # In-process front for the shared store; bounded by the shorter (dead link) TTL
+        self._cache: TTLCache = TTLCache(maxsize=4096, ttl=settings.dead_link_ttl)
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def load(self, urls: Iterable[str]):
+        """Pulls shared-store results for URLs not in the in-process cache, in one query."""
+        keys = [f"link:{url}" for url in set(urls) if url not in self._cache]
+        if keys:
+            for key, value in (await store.run(store.get_many, keys)).items():
+                self._cache[key[len("link:"):]] = value == b"1"
+
+    def cached(self, url: str) -> Optional[bool]:
+        """Last known health of the URL, or None if it hasn't been probed within its TTL (after load())."""
+        return self._cache.get(url)
+
+    def check(self, url: str) -> asyncio.Task:
+        """Starts a probe, or joins the one already running for the same URL."""
+        task = self._pending.get(url)
+        if task is None:
+            task = asyncio.create_task(self._probe(url))
+            self._pending[url] = task
+            task.add_done_callback(lambda _: self._pending.pop(url, None))
+        return task
+
+    async def _probe(self, url: str) -> Optional[bool]:
+        import httpx
+        from adapters.base import get_client
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.link_probe_concurrency)
+        async with self._semaphore:
+            metrics.incr("link_probes")
+            try:
+                response = await get_client().head(url, follow_redirects=True, timeout=settings.link_probe_timeout)
+                # Bot walls and servers without HEAD support still show the URL is served
+                healthy = response.status_code < 400 or response.status_code in (401, 403, 405, 429)
+            except httpx.TimeoutException:
+                return None  # Slow, not dead; leave it unknown for the next search
+            except httpx.HTTPError:
+                healthy = False
+        ttl = settings.link_health_ttl if healthy else settings.dead_link_ttl
+        self._cache[url] = healthy
+        await store.run(store.set, f"link:{url}", b"1" if healthy else b"0", ttl)
+        return healthy
+
+oa_index = OALocationIndex()
+link_health = LinkHealthChecker()
+
+def oa_candidates(paper: ScholarlyPaper, indexed: Optional[str]) -> List[str]:
+    """OA copies of a paper in preference order: PDFs, the DOI index entry, landing pages."""
+    pdfs = [s.url for s in paper.sources if s.access_type == "oa" and s.label == "Open Access PDF"]
+    pages = [s.url for s in paper.sources if s.access_type == "oa" and s.label != "Open Access PDF"]
+    if indexed and indexed not in pdfs and indexed not in pages:
+        pdfs.append(indexed)
+    return pdfs + pages
+
+async def enrich_open_access(papers: List[ScholarlyPaper]):
+    """
+    Picks the best reachable OA copy for each deduplicated paper. Unknown links
+    are probed concurrently within link_probe_budget; probes still running after
+    that finish in the background and serve later searches from the cache.
+    The DOI index and known link health are read in one batch per search.
+    """
+    indexed = await oa_index.lookup_many(paper.doi for paper in papers if paper.doi)
+    plans = []
+    for paper in papers:
+        plans.append((paper, oa_candidates(paper, indexed.get(paper.doi.lower()) if paper.doi else None)))
+    await link_health.load(url for _, candidates in plans for url in candidates)
+
+    probes: Dict[str, asyncio.Task] = {}
+    for paper, candidates in plans:
+        for url in candidates[:MAX_PROBES_PER_PAPER]:
+            if url not in probes and link_health.cached(url) is None:
+                probes[url] = link_health.check(url)
+
+    if probes:
+        await asyncio.wait(list(probes.values()), timeout=settings.link_probe_budget)
+
+    verified_locations = {}
+    for paper, candidates in plans:
+        health = {url: link_health.cached(url) for url in candidates}
+        verified = [url for url in candidates if health[url] is True]
+        unknown = [url for url in candidates if health[url] is None]
+        best = (verified or unknown or [None])[0]
+        paper.best_oa_url = best
+        for source in paper.sources:
+            if source.url in health:
+                source.reachable = health[source.url]
+        if paper.doi and best and health[best] is True and indexed.get(paper.doi.lower()) != best:
+            verified_locations[paper.doi] = best
+    await oa_index.record_many(verified_locations)
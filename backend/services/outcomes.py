@@ -0,0 +1,83 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
+from config import settings
+from models import ScholarlyPaper, Researcher, SourceOutcome
+from services.metrics import metrics
+from services.shared_store import RateLimited, store
+
+# Statuses that leave a response complete; anything else marks it degraded
+HEALTHY = frozenset({"ok", "skipped"})
+
+# The outcome of the upstream call running in this task, for retry accounting
+current_outcome: ContextVar[Optional[SourceOutcome]] = ContextVar("current_outcome", default=None)
+
+_result_types = {"search": List[ScholarlyPaper], "authors": List[Researcher]}
+_adapters: Dict[str, TypeAdapter] = {}
+
+def _type_adapter(kind: str) -> TypeAdapter:
+    if kind not in _adapters:
+        _adapters[kind] = TypeAdapter(_result_types[kind])
+    return _adapters[kind]
+
+def record_retry():
+    outcome = current_outcome.get()
+    if outcome is not None:
+        outcome.retries += 1
+
+def classify(error: BaseException) -> str:
+    import httpx
+
+    if isinstance(error, RateLimited):
+        return "rate_limited"
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        return "rate_limited" if error.response.status_code == 429 else "http_error"
+    if isinstance(error, httpx.HTTPError):
+        return "http_error"
+    # Anything else was raised while reading the upstream's payload
+    return "parse_error"
+
+def is_degraded(outcomes: List[SourceOutcome]) -> bool:
+    return any(outcome.status not in HEALTHY or outcome.stale for outcome in outcomes)
+
+def skipped(source: str) -> SourceOutcome:
+    return SourceOutcome(source=source, status="skipped")
+
+async def call_source(source: str, kind: str, query_key: Optional[str], call: Callable[[], Awaitable[list]]) -> Tuple[list, SourceOutcome]:
+    """
+    Runs one upstream call and reports how it went. Good results are kept per
+    source and query; when the source fails they stand in, marked stale. With
+    no query_key nothing is kept or stood in.
+    """
+    outcome = SourceOutcome(source=source)
+    current_outcome.set(outcome)
+    stale_key = f"stale:{kind}:{source}:{query_key}"
+    start = time.perf_counter()
+    try:
+        results = await call()
+    except Exception as e:
+        outcome.status = classify(e)
+        outcome.error = (str(e).splitlines() or [type(e).__name__])[0][:200]
+        results = []
+    outcome.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    metrics.observe(f"upstream_{source}", outcome.latency_ms)
+    metrics.incr(f"upstream_{outcome.status}")
+
+    if outcome.status == "ok":
+        if results and query_key is not None:
+            await store.run(store.set, stale_key, _type_adapter(kind).dump_json(results), settings.source_stale_ttl)
+    else:
+        cached = await store.run(store.get, stale_key) if query_key is not None else None
+        if cached is not None:
+            results = _type_adapter(kind).validate_json(cached)
+            outcome.stale = True
+        print(
+            f"Upstream {source} {kind} {outcome.status} after {outcome.latency_ms:.0f} ms "
+            f"(retries={outcome.retries}, stale={outcome.stale}): {outcome.error}"
+        )
+    outcome.result_count = len(results)
+    return results, outcome
@@ -0,0 +1,45 @@
+from typing import FrozenSet, Optional
+from pydantic import BaseModel
+from models import ScholarlyPaper
+
+# Per-paper fields a client can ask for with ?view= or ?fields=. Citation strings
+# are most of a full payload, so they are only rendered when requested.
+ALL_FIELDS: FrozenSet[str] = frozenset(ScholarlyPaper.model_fields)
+CITATION_FIELDS: FrozenSet[str] = frozenset({"bibtex", "ris", "formatted_citations"})
+# What the popup's result list displays, plus the bibliographic details the
+# popup passes back to POST /citations when a paper is collected or exported
+LIST_FIELDS: FrozenSet[str] = frozenset({
+    "title", "authors", "year", "journal", "volume", "issue", "pages", "doi",
+    "sources", "best_oa_url", "source_api", "openalex_id", "citation_count",
+})
+VIEWS = {"full": ALL_FIELDS, "list": LIST_FIELDS}
+
+def select_fields(view: str = "full", fields: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Paper fields for a request. `fields` is a comma-separated list and overrides
+    `view`; "title" is always included. Raises ValueError for unknown names.
+    """
+    if not fields:
+        if view not in VIEWS:
+            raise ValueError(f"Unknown view '{view}'; expected one of {', '.join(sorted(VIEWS))}")
+        return VIEWS[view]
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - ALL_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"title"}
+
+def cache_suffix(selected: FrozenSet[str]) -> str:
+    """Cache-key suffix for a projection; full responses keep the unsuffixed key."""
+    if selected == ALL_FIELDS:
+        return ""
+    if selected == LIST_FIELDS:
+        return "|list"
+    return "|fields=" + ",".join(sorted(selected))
+
+def dump_response(response: BaseModel) -> bytes:
+    """Serializes a response, leaving out paper fields outside its `fields` projection."""
+    selected = getattr(response, "fields", None)
+    if selected is None or selected == ALL_FIELDS:
+        return response.model_dump_json().encode()
+    return response.model_dump_json(exclude={"results": {"__all__": set(ALL_FIELDS - selected)}}).encode()
@@ -0,0 +1,63 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s\"'<>]+)", re.IGNORECASE)
+# A query that is nothing but a DOI, bare, prefixed or as a resolver URL
+WHOLE_DOI_PATTERN = re.compile(r"^(?:doi:\s*|https?://(?:dx\.)?doi\.org/)?(10\.\d{4,9}/\S+)$", re.IGNORECASE)
+# New-style (2101.00001) and old-style (hep-th/9901001) identifiers
+ARXIV_ID = r"(\d{4}\.\d{4,5}|[a-z][a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?"
+ARXIV_PATTERN = re.compile(
+    rf"^(?:arxiv:\s*|https?://arxiv\.org/(?:abs|pdf)/)?{ARXIV_ID}(?:\.pdf)?$", re.IGNORECASE
+)
+ARXIV_DOI_PATTERN = re.compile(rf"^10\.48550/arxiv\.{ARXIV_ID}$", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+class NormalizedQuery:
+    """
+    A search query in canonical form. `text` is what upstreams receive, and
+    `key` identifies it for caching, request coalescing and metrics. The key is
+    derived from `text` alone, so two queries share cached results only if
+    upstreams would have received the same thing for both.
+    """
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        # NFKC folds full-width and compatibility characters; then fold whitespace and case
+        text = " ".join(unicodedata.normalize("NFKC", raw).split()).casefold()
+        # A lone identifier is sent in one canonical form, whichever way it was written
+        arxiv_id = extract_arxiv_id(text)
+        whole_doi = WHOLE_DOI_PATTERN.match(text)
+        if arxiv_id:
+            text = f"arxiv:{arxiv_id}"
+        elif whole_doi:
+            text = extract_doi(whole_doi.group(1))
+        self.text = text
+        self.tokens: List[str] = TOKEN_PATTERN.findall(self.text)
+        self.doi: Optional[str] = extract_doi(self.text)
+        self.arxiv_id: Optional[str] = extract_arxiv_id(self.text)
+
+    @property
+    def is_doi(self) -> bool:
+        """The whole query is a DOI, not a search that happens to mention one."""
+        return bool(self.doi) and self.text == self.doi
+
+    @property
+    def key(self) -> str:
+        if self.is_doi:
+            return f"doi:{self.doi}"
+        return self.text  # Already "arxiv:<id>" for an arXiv lookup
+
+def extract_doi(text: str) -> Optional[str]:
+    match = DOI_PATTERN.search(text)
+    if not match:
+        return None
+    return match.group(1).rstrip(".,;:)]}").lower()
+
+def extract_arxiv_id(text: str) -> Optional[str]:
+    """Returns the arXiv ID when the whole query is one (bare, prefixed, URL or arXiv DOI)."""
+    match = ARXIV_PATTERN.match(text.strip()) or ARXIV_DOI_PATTERN.match(text.strip())
+    return match.group(1).lower() if match else None
+
+def normalize_query(raw: str) -> NormalizedQuery:
+    return NormalizedQuery(raw)
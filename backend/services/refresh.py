@@ -0,0 +1,120 @@
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Tuple
+from config import settings
+from services.http_cache import CachedPayload, put_payload
+from services.metrics import metrics
+from services.projection import dump_response
+from services.outcomes import is_degraded
+from services.shared_store import BackgroundBudget, background_budget, store
+
+class PopularityTracker:
+    """Exponentially decaying request counter per cache key (half-life in seconds)."""
+
+    def __init__(self, half_life: float, max_keys: int):
+        self.decay = math.log(2) / half_life
+        self.max_keys = max_keys
+        self._scores: Dict[str, Tuple[float, float]] = {}  # key -> (score, updated_at)
+
+    def score(self, key: str, now: float = None) -> float:
+        if key not in self._scores:
+            return 0.0
+        score, updated_at = self._scores[key]
+        return score * math.exp(-self.decay * ((now or time.monotonic()) - updated_at))
+
+    def hit(self, key: str):
+        now = time.monotonic()
+        self._scores[key] = (self.score(key, now) + 1.0, now)
+        if len(self._scores) > self.max_keys:
+            # Drop the coldest tenth in one pass rather than one key per hit
+            coldest = sorted(self._scores, key=lambda k: self.score(k, now))
+            for cold_key in coldest[:max(1, self.max_keys // 10)]:
+                del self._scores[cold_key]
+
+    def top(self, n: int, min_score: float) -> List[str]:
+        now = time.monotonic()
+        scored = [(self.score(key, now), key) for key in self._scores]
+        return [key for score, key in sorted(scored, reverse=True)[:n] if score >= min_score]
+
+    def dump(self) -> List[list]:
+        now = time.monotonic()
+        return [[key, self.score(key, now)] for key in self._scores]
+
+    def restore(self, rows: List[list], elapsed: float):
+        """Adds decayed scores saved `elapsed` seconds ago to any counted since startup."""
+        now = time.monotonic()
+        factor = math.exp(-self.decay * elapsed)
+        for key, score in rows[:self.max_keys]:
+            self._scores[key] = (self.score(key, now) + score * factor, now)
+
+class RefreshScheduler:
+    """
+    Re-computes popular cached responses shortly before they expire so users keep
+    hitting a warm cache. Runs only while this worker serves no live upstream
+    searches, spends only rate-limit budget above the reserve kept for live
+    traffic, and discards any refresh that got throttled part-way.
+    """
+
+    def __init__(self):
+        self.popularity = PopularityTracker(settings.refresh_half_life, settings.refresh_max_tracked)
+        self._computes: Dict[str, Callable[[], Awaitable]] = {}
+        self.live_requests = 0
+
+    def track(self, key: str, compute: Callable[[], Awaitable]):
+        self.popularity.hit(key)
+        self._computes[key] = compute
+        if len(self._computes) > settings.refresh_max_tracked:
+            for stale_key in [k for k in self._computes if self.popularity.score(k) == 0.0]:
+                del self._computes[stale_key]
+
+    @contextmanager
+    def live(self):
+        """Wraps live requests that fan out upstream; background refresh yields to them."""
+        self.live_requests += 1
+        try:
+            yield
+        finally:
+            self.live_requests -= 1
+
+    async def due(self) -> List[str]:
+        keys = self.popularity.top(settings.refresh_top_n, settings.refresh_min_score)
+        due = []
+        for key in keys:
+            remaining = await store.run(store.expires_in, f"response:{key}")
+            if remaining is None or remaining < settings.refresh_ahead:
+                due.append(key)
+        return due
+
+    async def refresh(self, key: str) -> bool:
+        compute = self._computes.get(key)
+        # One worker per key and interval, however many workers track it
+        if compute is None or not await store.run(store.claim, f"refresh-lease:{key}", settings.refresh_interval):
+            return False
+        budget = BackgroundBudget(settings.refresh_reserve_ratio)
+        token = background_budget.set(budget)
+        try:
+            result = await compute()
+        finally:
+            background_budget.reset(token)
+        if budget.throttled or not result.results or is_degraded(getattr(result, "source_outcomes", [])):
+            metrics.incr("refresh_skipped")
+            return False
+        await put_payload(key, CachedPayload(dump_response(result)))
+        metrics.incr("refresh_completed")
+        return True
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.refresh_interval)
+            for key in await self.due():
+                if self.live_requests:
+                    metrics.incr("refresh_yielded")
+                    break
+                try:
+                    await self.refresh(key)
+                except Exception as e:
+                    print(f"Refresh Error ({key}): {e}")
+
+refresher = RefreshScheduler()
@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional, Tuple
+from models import ScholarlyPaper
+
+def get_dedup_key(paper: ScholarlyPaper) -> str:
+    """Fallback key: title + year + first author last name."""
+    title_clean = "".join(filter(str.isalnum, paper.title.lower()))
+    year = str(paper.year) if paper.year else ""
+    author = paper.authors[0].name.split()[-1].lower() if paper.authors else ""
+    return f"{title_clean}|{year}|{author}"
+
+def merge_paper(existing: ScholarlyPaper, paper: ScholarlyPaper):
+    """Folds a duplicate record's sources and missing metadata into the existing one."""
+    # Merge sources; an upstream reporting a shared URL as OA outranks one
+    # that defaults it to paywalled (Crossref marks every publisher link so)
+    existing_by_url = {s.url: s for s in existing.sources}
+    for new_source in paper.sources:
+        match = existing_by_url.get(new_source.url)
+        if match is None:
+            existing.sources.append(new_source)
+            existing_by_url[new_source.url] = new_source
+        elif new_source.access_type == "oa" and match.access_type == "paywalled":
+            match.access_type = "oa"
+
+    # Update missing metadata
+    if paper.citation_count > (existing.citation_count or 0):
+        existing.citation_count = paper.citation_count
+    if not existing.year and paper.year:
+        existing.year = paper.year
+    if not existing.journal and paper.journal:
+        existing.journal = paper.journal
+    if not existing.doi and paper.doi:
+        existing.doi = paper.doi
+    if not existing.openalex_id and paper.openalex_id:
+        existing.openalex_id = paper.openalex_id
+
+class DedupIndex:
+    """Distinct papers by DOI, then title+year+author; records can be added incrementally."""
+
+    def __init__(self):
+        self.by_doi: Dict[str, ScholarlyPaper] = {}
+        self.by_fallback: Dict[str, ScholarlyPaper] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_doi) + len(self.by_fallback)
+
+    def add(self, paper: ScholarlyPaper) -> Tuple[ScholarlyPaper, bool]:
+        """Returns the record the paper now lives in, and whether it is a new one."""
+        doi = paper.doi.lower() if paper.doi else None
+        fallback_key = get_dedup_key(paper)
+        existing: Optional[ScholarlyPaper] = self.by_doi.get(doi) if doi else self.by_fallback.get(fallback_key)
+        if existing:
+            merge_paper(existing, paper)
+            return existing, False
+        if doi:
+            self.by_doi[doi] = paper
+        else:
+            self.by_fallback[fallback_key] = paper
+        return paper, True
+
+    def papers(self) -> List[ScholarlyPaper]:
+        return list(self.by_doi.values()) + list(self.by_fallback.values())
+
+def deduplicate_results(results: List[ScholarlyPaper]) -> List[ScholarlyPaper]:
+    """
+    Deduplicate papers based on DOI, then title+year+author.
+    Merges sources for duplicate records.
+    """
+    index = DedupIndex()
+    for paper in results:
+        index.add(paper)
+    return index.papers()
+
+def boost_relevance(paper: ScholarlyPaper, q_lower: str):
+    """Adds a local relevance boost for how closely the title matches the query."""
+    title_lower = paper.title.lower()
+    match_score = 0
+    if title_lower == q_lower:
+        match_score = 100 # Exact match
+    elif title_lower.startswith(q_lower):
+        match_score = 50 # Starts with query
+    elif q_lower in title_lower:
+        match_score = 25 # Contains query
+
+    paper.relevance_score = (paper.relevance_score or 0) + match_score
+
+def rank_key(paper: ScholarlyPaper) -> Tuple[float, int, int, int]:
+    """Sort key for results, best first when sorted in reverse."""
+    return (
+        paper.relevance_score or 0,
+        paper.citation_count or 0,
+        1 if paper.doi else 0,
+        paper.year or 0
+    )
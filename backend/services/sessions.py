@@ -0,0 +1,130 @@
+import asyncio
+import heapq
+import itertools
+import secrets
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from models import ScholarlyPaper, SourceOutcome
+from services.query import NormalizedQuery
+from services.results import DedupIndex, boost_relevance, rank_key
+
+class ResultSession:
+    """
+    Merged results of one query, handed out page by page. Adapter pages are
+    merged as they arrive: each paper goes into the dedup index, and papers not
+    yet delivered sit in a heap keyed by rank, so serving a page is a few heap
+    pops instead of re-deduplicating and re-sorting everything seen so far.
+    """
+
+    def __init__(self, token: str, query: NormalizedQuery):
+        self.token = token
+        self.query = query
+        self.index = DedupIndex()
+        self.offsets: Dict[str, int] = {}  # next upstream offset per adapter still paging
+        self.outcomes: Dict[str, SourceOutcome] = {}  # latest per adapter
+        self.pages = 0
+        self.lock = asyncio.Lock()
+        self.touched = time.monotonic()
+        self._q_lower = query.text.lower()
+        # Undelivered papers and their current rank; heap entries whose rank is
+        # outdated (the record merged a duplicate since) are skipped when popped
+        self._pending: Dict[int, ScholarlyPaper] = {}
+        self._ranks: Dict[int, tuple] = {}
+        self._heap: List[Tuple[tuple, int, int]] = []
+        self._seq = itertools.count()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def can_fetch(self) -> bool:
+        return bool(self.offsets) and len(self.index) < settings.session_max_papers
+
+    @property
+    def has_more(self) -> bool:
+        return bool(self._pending) or self.can_fetch
+
+    def merge(self, papers: List[ScholarlyPaper]):
+        for paper in papers:
+            record, is_new = self.index.add(paper)
+            key = id(record)
+            if is_new:
+                boost_relevance(record, self._q_lower)
+                self._pending[key] = record
+            elif key not in self._pending:
+                continue  # Already delivered; merged metadata shows up in later fetches only
+            rank = rank_key(record)
+            if self._ranks.get(key) != rank:
+                self._ranks[key] = rank
+                heapq.heappush(self._heap, (tuple(-value for value in rank), next(self._seq), key))
+
+    def record_page(self, source: str, requested: int, results: List[ScholarlyPaper], outcome: SourceOutcome):
+        """Advances the adapter's offset, or stops paging it once it runs dry or fails."""
+        self.outcomes[source] = outcome
+        if outcome.status != "ok" or len(results) < requested:
+            self.offsets.pop(source, None)
+        else:
+            self.offsets[source] += requested
+        self.merge(results)
+
+    def take(self, size: int) -> List[ScholarlyPaper]:
+        page = []
+        while self._heap and len(page) < size:
+            negated, _, key = heapq.heappop(self._heap)
+            if key in self._pending and self._ranks[key] == tuple(-value for value in negated):
+                page.append(self._pending.pop(key))
+                del self._ranks[key]
+        self.pages += 1
+        return page
+
+class SessionStore:
+    """Result sessions by token, expiring after `ttl` idle seconds and capped at `max_sessions` (LRU)."""
+
+    def __init__(self, max_sessions: int, ttl: float):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, ResultSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def new(self, query: NormalizedQuery) -> ResultSession:
+        """A session not yet stored; add() it once its first page has been admitted."""
+        return ResultSession(secrets.token_urlsafe(16), query)
+
+    def create(self, query: NormalizedQuery) -> ResultSession:
+        return self.add(self.new(query))
+
+    def add(self, session: ResultSession) -> ResultSession:
+        self.purge_expired()
+        self._sessions[session.token] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def get(self, token: str) -> Optional[ResultSession]:
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if time.monotonic() - session.touched > self.ttl:
+            del self._sessions[token]
+            return None
+        session.touched = time.monotonic()
+        self._sessions.move_to_end(token)
+        return session
+
+    def purge_expired(self):
+        now = time.monotonic()
+        # Least recently used first, so stop at the first live session
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if now - session.touched <= self.ttl:
+                break
+            del self._sessions[token]
+
+# Sessions live in the worker that created them; multi-worker deployments need
+# sticky routing for /search/session tokens.
+sessions = SessionStore(settings.session_max, settings.session_ttl)
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from config import settings
+from services.metrics import metrics
+
+# State shared by every worker process on the host: response cache entries and
+# token buckets for upstream rate limits. SQLite in WAL mode gives cross-process
+# atomicity without running a separate service, and the file survives worker restarts.
+# Calls block (on disk I/O, or up to the busy timeout while another worker holds the
+# write lock), so async code goes through `store.run`, which uses a small thread pool.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_expiry ON cache (expires_at);
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+class SharedStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._executor = None
+        self._executor_pid = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    async def run(self, method: Callable, *args):
+        """Runs a blocking store method off the event loop."""
+        if self._executor is None or self._executor_pid != os.getpid():
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="shared-store")
+            self._executor_pid = os.getpid()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Unexpired values for any of the keys, in one query per 500 keys."""
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(self._conn().execute(
+                f"SELECT key, value FROM cache WHERE expires_at > ? AND key IN ({', '.join('?' * len(chunk))})",
+                [now] + chunk,
+            ).fetchall())
+        return found
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+
+    def set_many(self, items: Dict[str, bytes], ttl: float):
+        expires_at = time.time() + ttl
+        self._conn().executemany(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, value, expires_at) for key, value in items.items()],
+        )
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Seconds until the entry expires, or None if it is missing or already expired."""
+        row = self._conn().execute("SELECT expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] <= time.time():
+            return None
+        return row[0] - time.time()
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """Takes a host-wide lease on key unless another worker holds an unexpired one."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at <= ?",
+            (key, str(os.getpid()).encode(), now + ttl, now),
+        )
+        return cursor.rowcount > 0
+
+    def entries(self, prefixes: Tuple[str, ...]) -> List[Tuple[str, bytes, float]]:
+        """Unexpired (key, value, expires_at) rows whose key starts with one of the prefixes."""
+        clause = " OR ".join("substr(key, 1, ?) = ?" for _ in prefixes)
+        params = [value for prefix in prefixes for value in (len(prefix), prefix)]
+        return self._conn().execute(
+            f"SELECT key, value, expires_at FROM cache WHERE expires_at > ? AND ({clause})",
+            [time.time()] + params,
+        ).fetchall()
+
+    def restore(self, rows: List[Tuple[str, bytes, float]]):
+        """Writes (key, value, expires_at) rows, keeping whichever copy of a key expires later."""
+        self._conn().executemany(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at < excluded.expires_at",
+            rows,
+        )
+
+    def trim(self, prefix: str, max_entries: int) -> int:
+        """Deletes the soonest-expiring entries under prefix beyond max_entries."""
+        return self._conn().execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE substr(key, 1, ?) = ? "
+            "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (len(prefix), prefix, max_entries),
+        ).rowcount
+
+    def purge_expired(self) -> int:
+        return self._conn().execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def take_token(self, name: str, rate: float, burst: int, reserve: float = 0.0) -> float:
+        """
+        Takes one token from the named bucket if more than `reserve` would remain.
+        Returns 0 on success, otherwise the seconds until a token frees up.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens = float(burst) if row is None else min(float(burst), row[0] + (now - row[1]) * rate)
+            if tokens >= 1 + reserve:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 + reserve - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+class RateLimited(Exception):
+    """Raised when an upstream's shared budget would not free up within the allowed wait."""
+
+class BackgroundBudget:
+    """
+    Marks upstream calls made for background work. They never wait, and only spend
+    tokens above a reserve kept for live traffic; `throttled` records that one was refused.
+    """
+
+    def __init__(self, reserve_ratio: float):
+        self.reserve_ratio = reserve_ratio
+        self.throttled = False
+
+background_budget: ContextVar[Optional[BackgroundBudget]] = ContextVar("background_budget", default=None)
+
+async def acquire(name: str, rate: float, burst: int, max_wait: Optional[float] = None):
+    """Waits for a token from the host-wide bucket for an upstream API."""
+    budget = background_budget.get()
+    if budget is not None:
+        if await store.run(store.take_token, name, rate, burst, burst * budget.reserve_ratio) == 0:
+            return
+        budget.throttled = True
+        raise RateLimited(f"{name}: budget reserved for live traffic")
+
+    max_wait = settings.rate_limit_max_wait if max_wait is None else max_wait
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait = await store.run(store.take_token, name, rate, burst)
+        if wait == 0:
+            return
+        if time.monotonic() + wait > deadline:
+            raise RateLimited(f"{name}: no request budget within {max_wait:.1f}s")
+        await asyncio.sleep(wait)
+
+store = SharedStore(settings.shared_store_path)
+
+async def purge_periodically():
+    """
+    Deletes expired cache rows every store_purge_interval seconds, and trims stale
+    per-source results (one row per source and query) to their cap, so the file stays bounded.
+    """
+    while True:
+        await asyncio.sleep(settings.store_purge_interval)
+        try:
+            metrics.incr("store_purged", await store.run(store.purge_expired))
+            metrics.incr("store_trimmed", await store.run(store.trim, "stale:", settings.source_stale_max_entries))
+        except sqlite3.Error as e:
+            print(f"Shared store purge failed: {e}")
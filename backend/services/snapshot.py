@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import Optional, Tuple
+from pydantic import BaseModel
+import models
+from config import settings
+from models import ScholarlyPaper
+from services.metrics import metrics
+from services.refresh import refresher
+from services.shared_store import store
+from services.suggest import suggest_index
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:  # Optional: snapshots fall back to zlib-compressed JSON
+    msgpack = zstandard = None
+
+# In-memory state that would otherwise be lost on every redeploy or spin-down
+# (suggest index, citation graph, request popularity) is written to one file
+# periodically and on shutdown, together with the shared store's cached responses,
+# stale per-source results and OA/link lookups, and read back after startup.
+
+MAGIC = b"SCHOLARLY-SNAPSHOT\n"
+FORMAT = 1
+# Shared-store entries carried over; leases belong to the run that took them
+STORE_PREFIXES = ("response:", "stale:", "oa:", "link:")
+# Entries restored between yields to the event loop
+RESTORE_BATCH = 2000
+# Workers shutting down together leave one snapshot, not one overwriting another
+SHUTDOWN_LEASE_TTL = 30.0
+
+_version: Optional[str] = None
+
+def schema_version() -> str:
+    """Hash of the snapshot format and every model's JSON schema; any change in models.py invalidates old snapshots."""
+    global _version
+    if _version is None:
+        schemas = {
+            name: value.model_json_schema()
+            for name, value in vars(models).items()
+            if isinstance(value, type) and issubclass(value, BaseModel) and value.__module__ == models.__name__
+        }
+        encoded = json.dumps([FORMAT, schemas], sort_keys=True).encode()
+        _version = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+    return _version
+
+def encode(state: dict) -> Tuple[str, bytes]:
+    if msgpack is not None:
+        return "msgpack+zstd", zstandard.ZstdCompressor(level=3).compress(msgpack.packb(state, use_bin_type=True))
+    return "json+zlib", zlib.compress(json.dumps(state, separators=(",", ":")).encode(), 6)
+
+def decode(codec: str, body: bytes) -> dict:
+    if codec == "msgpack+zstd" and msgpack is not None:
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(body), raw=False)
+    if codec == "json+zlib":
+        return json.loads(zlib.decompress(body))
+    raise ValueError(f"unsupported codec {codec}")
+
+class Snapshotter:
+    """
+    Saves and restores the snapshot file. Collecting state is a quick copy on the
+    event loop; serializing, compressing and file I/O run in a thread, and restored
+    entries are applied in batches so startup and live requests aren't blocked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Saving before the previous snapshot has been read back would discard it
+        self.restored = False
+
+    def collect(self) -> dict:
+        from services.graph import graph
+
+        return {
+            "suggest": suggest_index.dump(),
+            "graph": graph.dump(),
+            "popularity": refresher.popularity.dump(),
+        }
+
+    def write(self, state: dict) -> int:
+        graph = state["graph"]
+        graph["nodes"] = [[paper.model_dump(mode="json"), references, citations] for paper, references, citations in graph["nodes"]]
+        graph["fallback"] = [[paper_id, relation, age, [paper.model_dump(mode="json") for paper in papers]] for paper_id, relation, age, papers in graph["fallback"]]
+        state["store"] = [[key, value.decode(), expires_at] for key, value, expires_at in store.entries(STORE_PREFIXES)]
+        codec, body = encode(state)
+        header = json.dumps({"version": schema_version(), "codec": codec, "created": time.time()}).encode()
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(MAGIC + header + b"\n" + body)
+        # Atomic, so a crash mid-write or another worker saving never leaves a torn file
+        os.replace(temp_path, self.path)
+        return len(body)
+
+    def read(self) -> Optional[dict]:
+        """The decoded snapshot with papers validated and ages brought up to date, or None if absent or outdated."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if not data.startswith(MAGIC):
+            raise ValueError("not a snapshot file")
+        header_line, _, body = data[len(MAGIC):].partition(b"\n")
+        header = json.loads(header_line)
+        if header["version"] != schema_version():
+            metrics.incr("snapshot_outdated")
+            print(f"Snapshot {self.path} was written for other models; ignoring it")
+            return None
+        state = decode(header["codec"], body)
+        elapsed = max(0.0, time.time() - header["created"])
+
+        now = time.time()
+        store.restore([(key, value.encode(), expires_at) for key, value, expires_at in state.pop("store") if expires_at > now])
+        graph = state["graph"]
+        graph["nodes"] = [
+            (ScholarlyPaper.model_validate(paper), references, [citations[0] + elapsed] + citations[1:] if citations else None)
+            for paper, references, citations in graph["nodes"]
+        ]
+        graph["fallback"] = [
+            (paper_id, relation, age + elapsed, [ScholarlyPaper.model_validate(paper) for paper in papers])
+            for paper_id, relation, age, papers in graph["fallback"]
+        ]
+        state["elapsed"] = elapsed
+        return state
+
+    async def apply(self, state: dict):
+        from services.graph import graph
+
+        suggest_rows = state["suggest"]
+        for start in range(0, len(suggest_rows), RESTORE_BATCH):
+            suggest_index.restore(suggest_rows[start:start + RESTORE_BATCH])
+            await asyncio.sleep(0)
+        nodes = state["graph"]["nodes"]
+        for start in range(0, len(nodes), RESTORE_BATCH):
+            graph.restore(nodes[start:start + RESTORE_BATCH], [])
+            await asyncio.sleep(0)
+        graph.restore([], state["graph"]["fallback"])
+        refresher.popularity.restore(state["popularity"], state["elapsed"])
+
+    async def restore(self) -> bool:
+        start = time.perf_counter()
+        try:
+            state = await asyncio.to_thread(self.read)
+            if state is not None:
+                await self.apply(state)
+        except Exception as e:
+            print(f"Snapshot Error (restore): {e}")
+            state = None
+        # Not reached if cancelled (shutdown during warm-up): the file on disk is
+        # then still the only complete copy, so it must not be saved over
+        self.restored = True
+        if state is None:
+            return False
+        metrics.observe("snapshot_restore", (time.perf_counter() - start) * 1000)
+        return True
+
+    async def save(self) -> bool:
+        if not self.restored:
+            return False
+        start = time.perf_counter()
+        try:
+            size = await asyncio.to_thread(self.write, self.collect())
+        except Exception as e:
+            print(f"Snapshot Error (save): {e}")
+            return False
+        metrics.observe("snapshot_save", (time.perf_counter() - start) * 1000)
+        metrics.observe("snapshot_bytes", size)
+        return True
+
+    async def save_on_shutdown(self) -> bool:
+        """Saves unless another worker saved during the same shutdown; each worker only knows its own state."""
+        if not self.restored or not await store.run(store.claim, "snapshot-shutdown-lease", SHUTDOWN_LEASE_TTL):
+            return False
+        return await self.save()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.snapshot_interval)
+            # Workers share the file; one of them writes it per interval
+            if self.restored and await store.run(store.claim, "snapshot-lease", settings.snapshot_interval):
+                await self.save()
+
+snapshots = Snapshotter(settings.snapshot_path)
@@ -0,0 +1,214 @@
+import bisect
+import heapq
+import math
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config import settings
+from models import ScholarlyPaper, Researcher
+from services.query import TOKEN_PATTERN
+
+# Upper bound on vocabulary tokens expanded for one prefix, so short prefixes stay cheap.
+MAX_PREFIX_EXPANSION = 200
+_MAX_CHAR = chr(0x10FFFF)
+
+EntryKey = Tuple[str, str]  # (kind, folded text)
+
+def fold(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+def within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+class SuggestEntry:
+    __slots__ = ("id", "text", "folded", "kind", "weight", "tokens")
+
+    def __init__(self, id: int, text: str, folded: str, kind: str, weight: float, tokens: Set[str]):
+        self.id = id
+        self.text = text
+        self.folded = folded
+        self.kind = kind
+        self.weight = weight
+        self.tokens = tokens
+
+class SuggestIndex:
+    """
+    In-memory autocomplete over titles, authors and venues seen in search results.
+    Tokens live in a sorted array for prefix ranges (bisect) with a posting set
+    per token; the last query token is matched as a prefix, earlier ones exactly,
+    and tokens with no match fall back to a one-edit fuzzy match. Entries are
+    evicted least-recently-seen first once max_entries is reached.
+    Postings hold integer entry IDs so set intersections and ranking stay cheap
+    when a common token matches tens of thousands of entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._ids: "OrderedDict[EntryKey, int]" = OrderedDict()  # in least-recently-seen order
+        self._entries: Dict[int, SuggestEntry] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._first: Dict[str, Set[int]] = {}  # entries by their first token
+        self._rank: Dict[int, Tuple[float, int]] = {}  # (weight, -length)
+        self._vocab: List[str] = []
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, text: Optional[str], kind: str, weight: float = 1.0):
+        if not text:
+            return
+        display = " ".join(text.split())
+        folded = fold(display)
+        key = (kind, folded)
+        entry_id = self._ids.get(key)
+        if entry_id is not None:
+            entry = self._entries[entry_id]
+            entry.weight += weight
+            self._rank[entry_id] = (entry.weight, -len(display))
+            self._ids.move_to_end(key)
+            return
+        ordered = TOKEN_PATTERN.findall(folded)
+        if not ordered:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        tokens = set(ordered)
+        self._ids[key] = entry_id
+        self._entries[entry_id] = SuggestEntry(entry_id, display, folded, kind, weight, tokens)
+        self._rank[entry_id] = (weight, -len(display))
+        self._first.setdefault(ordered[0], set()).add(entry_id)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                bisect.insort(self._vocab, token)
+            posting.add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._evict()
+
+    def add_papers(self, papers: Iterable[ScholarlyPaper]):
+        for paper in papers:
+            self.add(paper.title, "title", 1.0 + math.log10((paper.citation_count or 0) + 1))
+            for author in paper.authors[:5]:
+                self.add(author.name, "author", 0.5)
+            self.add(paper.journal, "venue", 0.5)
+
+    def add_researchers(self, researchers: Iterable[Researcher]):
+        for researcher in researchers:
+            self.add(researcher.name, "author", 1.0 + math.log10((researcher.citation_count or 0) + 1))
+
+    def dump(self) -> List[list]:
+        """Entries as [kind, text, weight], most recently seen first."""
+        return [[entry.kind, entry.text, entry.weight] for entry in map(self._entries.get, reversed(self._ids.values()))]
+
+    def restore(self, rows: Iterable[list]):
+        """
+        Adds entries from dump() (most recent first) that aren't indexed yet, as
+        older than anything seen since startup. Stops once the index is full.
+        """
+        for kind, text, weight in rows:
+            if len(self._entries) >= self.max_entries:
+                break
+            key = (kind, fold(" ".join(text.split())))
+            if key in self._ids:
+                continue
+            self.add(text, kind, weight)
+            if key in self._ids:
+                self._ids.move_to_end(key, last=False)
+
+    def _evict(self):
+        key, entry_id = self._ids.popitem(last=False)
+        entry = self._entries.pop(entry_id)
+        del self._rank[entry_id]
+        first = TOKEN_PATTERN.search(entry.folded).group()
+        self._first[first].discard(entry_id)
+        if not self._first[first]:
+            del self._first[first]
+        for token in entry.tokens:
+            posting = self._postings[token]
+            posting.discard(entry_id)
+            if not posting:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def _vocab_range(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self._vocab, prefix)
+        hi = bisect.bisect_left(self._vocab, prefix + _MAX_CHAR, lo)
+        return self._vocab[lo:min(hi, lo + MAX_PREFIX_EXPANSION)]
+
+    def _fuzzy_tokens(self, token: str, is_prefix: bool) -> List[str]:
+        """Vocabulary tokens one edit away; typos in the first letter are not covered."""
+        if len(token) < 3:
+            return []
+        lo = bisect.bisect_left(self._vocab, token[0])
+        hi = bisect.bisect_left(self._vocab, token[0] + _MAX_CHAR, lo)
+        n = len(token)
+        matches = []
+        for candidate in self._vocab[lo:hi]:
+            if is_prefix:
+                if len(candidate) >= n - 1 and any(
+                    within_one_edit(token, candidate[:length]) for length in (n - 1, n, n + 1)
+                ):
+                    matches.append(candidate)
+            elif within_one_edit(token, candidate):
+                matches.append(candidate)
+            if len(matches) >= MAX_PREFIX_EXPANSION:
+                break
+        return matches
+
+    def _match(self, token: str, is_prefix: bool) -> Set[int]:
+        tokens = self._vocab_range(token) if is_prefix else ([token] if token in self._postings else [])
+        if not tokens:
+            tokens = self._fuzzy_tokens(token, is_prefix)
+        ids: Set[int] = set()
+        for match in tokens:
+            ids |= self._postings[match]
+        return ids
+
+    def suggest(self, query: str, limit: int = 8) -> List[SuggestEntry]:
+        folded = fold(query)
+        tokens = TOKEN_PATTERN.findall(folded)
+        if not tokens:
+            return []
+        # A trailing space or separator means the last word is complete
+        last_char = unicodedata.normalize("NFKC", query)[-1]
+        prefix_last = last_char.isalnum() or last_char == "_"
+        candidates: Optional[Set[int]] = None
+        for i, token in enumerate(tokens):
+            matched = self._match(token, is_prefix=prefix_last and i == len(tokens) - 1)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        # Entries starting with the whole query get a boost. The boost doesn't
+        # reorder starters among themselves, so the overall top `limit` is among
+        # the top `limit` candidates plus the top `limit` starters. Starters share
+        # the query's first token (or extend it, for a one-token query).
+        rank = self._rank.__getitem__
+        heads: Set[int] = set()
+        for token in self._vocab_range(tokens[0]) if len(tokens) == 1 else [tokens[0]]:
+            heads |= self._first.get(token, set())
+        starters = heads & candidates
+        if folded != tokens[0]:
+            starters = [i for i in starters if self._entries[i].folded.startswith(folded)]
+        shortlist = set(heapq.nlargest(limit, candidates, key=rank))
+        shortlist.update(heapq.nlargest(limit, starters, key=rank))
+
+        def score(entry_id: int) -> Tuple[float, int]:
+            weight, length = self._rank[entry_id]
+            return (weight + (2.0 if self._entries[entry_id].folded.startswith(folded) else 0.0), length)
+
+        return [self._entries[i] for i in heapq.nlargest(limit, shortlist, key=score)]
+
+suggest_index = SuggestIndex(settings.suggest_max_entries)
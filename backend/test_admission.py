@@ -0,0 +1,67 @@
+import asyncio
+from starlette.requests import Request
+from services.admission import AdmissionController, Overloaded, client_id
+
+def test_limits_queue_and_shedding():
+    async def run():
+        control = AdmissionController(max_concurrent=1, per_client=2, max_queue=1, queue_timeout=0.2)
+        first = await control.acquire("a")
+        # Per-client limit counts queued requests too
+        queued = asyncio.create_task(control.acquire("a"))
+        await asyncio.sleep(0)
+        assert control.queued == 1
+        try:
+            await control.acquire("a")
+            assert False, "client limit not enforced"
+        except Overloaded as e:
+            assert e.status_code == 429 and e.retry_after >= 1
+        # Queue is full for everyone else
+        try:
+            await control.acquire("b")
+            assert False, "queue bound not enforced"
+        except Overloaded as e:
+            assert e.status_code == 503
+        # Releasing hands the slot to the queued request without freeing it in between
+        control.release(first)
+        second = await queued
+        assert control.active == 1 and control.queued == 0
+        # A waiter that isn't served in time is shed
+        try:
+            await control.acquire("b")
+            assert False, "queue timeout not enforced"
+        except Overloaded as e:
+            assert e.status_code == 503
+        control.release(second)
+        assert control.active == 0 and control._clients == {}
+
+    asyncio.run(run())
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def run():
+        control = AdmissionController(max_concurrent=1, per_client=5, max_queue=5, queue_timeout=5)
+        first = await control.acquire("a")
+        waiting = asyncio.create_task(control.acquire("b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        control.release(first)
+        assert control.active == 0 and control.queued == 0 and control._clients == {}
+
+    asyncio.run(run())
+
+def make_request(forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.2", 5000)})
+
+def test_spoofed_forwarded_for_does_not_change_the_client():
+    # Render's proxy appends the address it saw; anything before it came from the client
+    assert client_id(make_request("203.0.113.7")) == "203.0.113.7"
+    assert client_id(make_request("1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+    assert client_id(make_request("5.6.7.8, 1.1.1.1, 203.0.113.7")) == "203.0.113.7"
+    assert client_id(make_request()) == "10.0.0.2"
+
+if __name__ == "__main__":
+    test_limits_queue_and_shedding()
+    test_cancelled_waiter_gives_up_its_place()
+    test_spoofed_forwarded_for_does_not_change_the_client()
+    print("All admission tests passed.")
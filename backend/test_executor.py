@@ -0,0 +1,26 @@
+import asyncio
+from config import settings
+from services.executor import run_cpu_bound, shutdown_executor
+
+def rank(mode: str, seed: int):
+    from benchmarks.load_test import synthetic_result_set
+    from main import process_results
+
+    previous = settings.postprocess_executor
+    settings.postprocess_executor = mode
+    shutdown_executor()
+    try:
+        papers = asyncio.run(run_cpu_bound(process_results, synthetic_result_set(seed), "deep learning"))
+    finally:
+        shutdown_executor()
+        settings.postprocess_executor = previous
+    return [paper.model_dump(mode="json") for paper in papers]
+
+def test_executor_modes_rank_alike():
+    for seed in range(3):
+        inline = rank("inline", seed)
+        assert inline and rank("thread", seed) == inline
+
+if __name__ == "__main__":
+    test_executor_modes_rank_alike()
+    print("All executor tests passed.")
@@ -0,0 +1,125 @@
+import asyncio
+import math
+import services.graph
+from models import ScholarlyPaper
+from services.graph import CitationGraph, is_valid_paper_id, s2_paper_id
+
+def make_paper(node_id: str, doi: str = None) -> ScholarlyPaper:
+    return ScholarlyPaper(title=f"Paper {node_id}", authors=[], doi=doi, openalex_id=node_id, source_api="OpenAlex")
+
+class StubOpenAlex:
+    """Serves works W0..W999, each referencing the next 200, and counts upstream calls."""
+    BATCH_SIZE = 50
+
+    def __init__(self):
+        self.calls = []
+
+    def work(self, node_id: str):
+        n = int(node_id[1:])
+        return make_paper(node_id), [f"W{i}" for i in range(n + 1, n + 201)]
+
+    async def fetch_work(self, work_id: str):
+        self.calls.append(("work", work_id))
+        return self.work(work_id)
+
+    async def fetch_works(self, work_ids):
+        for start in range(0, len(work_ids), self.BATCH_SIZE):
+            self.calls.append(("works", work_ids[start:start + self.BATCH_SIZE]))
+        return [self.work(node_id) for node_id in work_ids]
+
+    async def fetch_citing(self, work_id: str, limit: int):
+        self.calls.append(("citing", work_id))
+        return [self.work(f"W{500 + i}") for i in range(limit)]
+
+def with_stub(scenario, max_nodes=1000):
+    stub = StubOpenAlex()
+    saved = services.graph.graph, services.graph._openalex, services.graph._s2
+    services.graph.graph = CitationGraph(max_nodes, citations_ttl=3600)
+    services.graph._openalex, services.graph._s2 = stub, object()
+    try:
+        asyncio.run(scenario(stub, services.graph.graph))
+    finally:
+        services.graph.graph, services.graph._openalex, services.graph._s2 = saved
+
+def test_paper_ids_map_to_semantic_scholar_forms():
+    assert s2_paper_id("649def34f8be52c8b66281af98ae884c09aef38b") == "649def34f8be52c8b66281af98ae884c09aef38b"
+    assert s2_paper_id("corpusid:215416146") == "CorpusId:215416146"
+    assert s2_paper_id("https://doi.org/10.1038/NATURE14539") == "DOI:10.1038/nature14539"
+    assert s2_paper_id("DOI:10.18653/v1/N18-3011") == "DOI:10.18653/v1/n18-3011"
+    assert s2_paper_id("arXiv:1706.03762v5") == "ARXIV:1706.03762"
+    assert is_valid_paper_id("W2741809807")
+
+def test_ids_that_would_change_the_upstream_url_are_rejected():
+    for paper_id in ["../../author/1", "abc/references?x=1", "10.1234/../../author", "W123/../x", "paper#1", ""]:
+        assert not is_valid_paper_id(paper_id), paper_id
+        assert s2_paper_id(paper_id) is None, paper_id
+
+def test_eviction_takes_edges_and_aliases_along():
+    graph = CitationGraph(max_nodes=2, citations_ttl=3600)
+    graph.add(make_paper("W1", doi="10.1/A"), ["W9"])
+    graph.set_citations("W1", 10, ["W8"])
+    graph.add(make_paper("W2"), [])
+    graph.node("W1")  # Now more recently used than W2
+    graph.add(make_paper("W3"), [])
+    assert graph.node("W2") is None and graph.node("W1") is not None
+    graph.add(make_paper("W4"), [])
+    graph.add(make_paper("W5"), [])
+    assert graph.node("W1") is None
+    assert graph.references("W1") is None and graph.citations("W1", 10) is None and graph.alias("10.1/a") is None
+
+def test_doi_aliases_are_case_insensitive():
+    graph = CitationGraph(max_nodes=10, citations_ttl=3600)
+    graph.add(make_paper("W1", doi="10.1038/NATURE14539"))
+    assert graph.alias("10.1038/nature14539") == graph.alias("10.1038/Nature14539") == "W1"
+
+def test_citations_cover_only_smaller_limits_unless_exhaustive():
+    graph = CitationGraph(max_nodes=10, citations_ttl=3600)
+    graph.add(make_paper("W1"))
+    graph.add(make_paper("W2"))
+    graph.set_citations("W1", 5, ["W3", "W4", "W5", "W6", "W7"])
+    assert graph.citations("W1", 5) and graph.citations("W1", 3)
+    assert graph.citations("W1", 10) is None  # There may be more than the five fetched
+    graph.set_citations("W2", 5, ["W3", "W4"])
+    assert graph.citations("W2", 10) == ["W3", "W4"]  # Fewer than asked for: that is all of them
+    graph.set_citations("W99", 5, ["W3"])
+    assert graph.citations("W99", 5) is None  # Not kept for nodes that aren't cached
+
+def test_missing_neighbours_are_fetched_in_batches():
+    async def scenario(stub, graph):
+        node_id, papers = await services.graph.neighbours("W0", "references", 120)
+        assert node_id == "W0" and [p.openalex_id for p in papers] == [f"W{i}" for i in range(1, 121)]
+        assert stub.calls[0] == ("work", "W0")
+        assert len(stub.calls[1:]) == math.ceil(120 / StubOpenAlex.BATCH_SIZE)
+        assert all(kind == "works" for kind, _ in stub.calls[1:])
+        # A second walk over cached nodes costs nothing
+        stub.calls.clear()
+        await services.graph.neighbours("W0", "references", 120)
+        assert stub.calls == []
+
+    with_stub(scenario)
+
+def test_evicted_citing_nodes_are_fetched_again():
+    async def scenario(stub, graph):
+        _, papers = await services.graph.neighbours("W0", "citations", 5)
+        assert len(papers) == 5 and [kind for kind, _ in stub.calls] == ["work", "citing"]
+        # W0 and its citing list stay in use while the citing nodes themselves are evicted
+        graph.node("W0")
+        for i in range(9):
+            graph.add(make_paper(f"W{900 + i}"), [])
+        assert graph.citations("W0", 5) and graph.node("W500") is None
+        stub.calls.clear()
+        _, papers = await services.graph.neighbours("W0", "citations", 5)
+        assert [p.openalex_id for p in papers] == [f"W{500 + i}" for i in range(5)]
+        assert stub.calls == [("works", [f"W{500 + i}" for i in range(5)])]
+
+    with_stub(scenario, max_nodes=10)
+
+if __name__ == "__main__":
+    test_paper_ids_map_to_semantic_scholar_forms()
+    test_ids_that_would_change_the_upstream_url_are_rejected()
+    test_eviction_takes_edges_and_aliases_along()
+    test_doi_aliases_are_case_insensitive()
+    test_citations_cover_only_smaller_limits_unless_exhaustive()
+    test_missing_neighbours_are_fetched_in_batches()
+    test_evicted_citing_nodes_are_fetched_again()
+    print("All graph tests passed.")
@@ -0,0 +1,83 @@
+import gzip
+import json
+import uuid
+from starlette.requests import Request
+from fastapi.testclient import TestClient
+from config import settings
+from services.http_cache import CachedPayload, accepted_encodings, brotli, compute_etag, etag_matches
+
+def make_request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+def test_etag_matching():
+    etag = compute_etag(b'{"results": []}')
+    assert etag.startswith('W/"') and etag == compute_etag(b'{"results": []}')
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)  # Weak comparison ignores the W/ prefix
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+
+def test_etag_ignores_source_timings():
+    def body(latency, error=None, status="ok", title="Deep learning"):
+        outcome = {"source": "Crossref", "status": status, "latency_ms": latency, "retries": 0, "result_count": 1, "stale": False, "error": error}
+        return json.dumps({"results": [{"title": title}], "source_outcomes": [outcome]}).encode()
+
+    assert compute_etag(body(120.5)) == compute_etag(body(980.0, error="slow"))
+    assert compute_etag(body(120.5)) != compute_etag(body(120.5, status="timeout"))
+    assert compute_etag(body(120.5)) != compute_etag(body(120.5, title="Deep learning, revisited"))
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert accepted_encodings("gzip;q=0.0, identity") == {"identity"}
+    assert accepted_encodings("br;q=oops") == {"br"}  # Malformed q-values count as 1
+    assert accepted_encodings(None) == set()
+
+def test_payload_responses():
+    small = CachedPayload(b'{"results": []}')
+    large = CachedPayload(b'{"results": "' + b"x" * settings.compression_min_size + b'"}')
+
+    # Small bodies are never compressed; large ones use br if accepted, else gzip
+    assert "content-encoding" not in small.to_response(make_request(accept_encoding="gzip")).headers
+    response = large.to_response(make_request(accept_encoding="gzip"))
+    assert response.headers["content-encoding"] == "gzip" and gzip.decompress(response.body) == large.body
+    if brotli is not None:
+        response = large.to_response(make_request(accept_encoding="gzip, br"))
+        assert response.headers["content-encoding"] == "br" and brotli.decompress(response.body) == large.body
+    assert "content-encoding" not in large.to_response(make_request(accept_encoding="gzip;q=0")).headers
+
+    not_modified = large.to_response(make_request(if_none_match=large.etag))
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert not_modified.headers["etag"] == large.etag and "max-age" in not_modified.headers["cache-control"]
+
+def test_repeated_search_is_not_modified():
+    import main
+    from adapters.base import BaseAdapter
+    from models import ScholarlyPaper
+
+    class Stub(BaseAdapter):
+        name = "Stub"
+
+        async def search(self, query, limit=10, offset=0):
+            return [ScholarlyPaper(title="Deep learning", authors=[], source_api="Stub")]
+
+    adapters, main._adapters = main._adapters, [Stub()]
+    try:
+        client = TestClient(main.app)
+        q = uuid.uuid4().hex
+        first = client.get("/search", params={"q": q})
+        assert first.status_code == 200 and first.headers["etag"]
+        again = client.get("/search", params={"q": q}, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304 and again.content == b""
+    finally:
+        main._adapters = adapters
+
+if __name__ == "__main__":
+    test_etag_matching()
+    test_etag_ignores_source_timings()
+    test_accepted_encodings()
+    test_payload_responses()
+    test_repeated_search_is_not_modified()
+    print("All HTTP cache tests passed.")
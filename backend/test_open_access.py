@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+from models import ScholarlyPaper, PaperSource
+from services.open_access import enrich_open_access, link_health, oa_index
+from services.shared_store import store
+
+def test_indexed_copy_and_known_link_health_are_read_in_one_batch():
+    doi = f"10.1234/{uuid.uuid4().hex}"
+    publisher = f"https://publisher.example/{doi}"
+    dead_pdf = f"https://repository.example/{doi}.pdf"
+    indexed_pdf = f"https://oa.example/{doi}.pdf"
+    store.set_many({f"link:{dead_pdf}": b"0", f"link:{indexed_pdf}": b"1"}, 3600)
+    store.set(f"oa:{doi}", indexed_pdf.encode(), 3600)
+    paper = ScholarlyPaper(title="Open paper", authors=[], doi=doi.upper(), source_api="Test", sources=[
+        PaperSource(url=publisher, label="Publisher Page", access_type="paywalled"),
+        PaperSource(url=dead_pdf, label="Open Access PDF", access_type="oa"),
+    ])
+
+    calls = []
+    run = store.run
+
+    async def counting_run(method, *args):
+        calls.append(method.__name__)
+        return await run(method, *args)
+
+    store.run = counting_run
+    try:
+        asyncio.run(enrich_open_access([paper]))
+    finally:
+        store.run = run
+    # No probes were needed: both candidates' health was already known
+    assert calls == ["get_many", "get_many"]
+    assert paper.best_oa_url == indexed_pdf
+    assert paper.sources[1].reachable is False and link_health.cached(indexed_pdf) is True
+    assert asyncio.run(oa_index.lookup_many([doi])) == {doi: indexed_pdf}
+
+if __name__ == "__main__":
+    test_indexed_copy_and_known_link_health_are_read_in_one_batch()
+    print("All open-access tests passed.")
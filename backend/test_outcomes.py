@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+import httpx
+from models import ScholarlyPaper
+from services.outcomes import call_source, classify, is_degraded
+from services.shared_store import RateLimited
+
+def test_classify():
+    request = httpx.Request("GET", "https://example.org/")
+    assert classify(httpx.ReadTimeout("slow", request=request)) == "timeout"
+    assert classify(RateLimited("no budget")) == "rate_limited"
+    for status, expected in ((429, "rate_limited"), (503, "http_error")):
+        error = httpx.HTTPStatusError("", request=request, response=httpx.Response(status, request=request))
+        assert classify(error) == expected
+    assert classify(httpx.ConnectError("refused")) == "http_error"
+    assert classify(KeyError("results")) == "parse_error"
+
+def test_failed_source_falls_back_to_last_good_results():
+    query_key = uuid.uuid4().hex
+
+    async def good():
+        return [ScholarlyPaper(title="Deep learning", authors=[], source_api="Test")]
+
+    async def broken():
+        raise httpx.ReadTimeout("read timed out")
+
+    async def run():
+        fresh, outcome = await call_source("Test", "search", query_key, good)
+        assert outcome.status == "ok" and outcome.result_count == 1 and not is_degraded([outcome])
+        stale, outcome = await call_source("Test", "search", query_key, broken)
+        assert outcome.status == "timeout" and outcome.stale and outcome.error == "read timed out"
+        assert [p.title for p in stale] == ["Deep learning"] and is_degraded([outcome])
+        missing, outcome = await call_source("Test", "search", uuid.uuid4().hex, broken)
+        assert missing == [] and not outcome.stale
+
+    asyncio.run(run())
+
+def test_stale_results_are_capped():
+    from services.shared_store import store
+
+    prefix = f"stale:search:{uuid.uuid4().hex}:"
+    for i in range(5):
+        store.set(f"{prefix}{i}", b"[]", 3600 + i)
+    assert store.trim(prefix, 2) == 3
+    # The most recently written (latest-expiring) entries survive
+    assert sorted(key for key, _, _ in store.entries((prefix,))) == [f"{prefix}3", f"{prefix}4"]
+
+def test_no_query_key_keeps_no_stale_copy():
+    async def broken():
+        raise httpx.ReadTimeout("read timed out")
+
+    async def run():
+        results, outcome = await call_source("Test", "search", None, broken)
+        assert results == [] and outcome.status == "timeout" and not outcome.stale
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_classify()
+    test_failed_source_falls_back_to_last_good_results()
+    test_stale_results_are_capped()
+    test_no_query_key_keeps_no_stale_copy()
+    print("All outcome tests passed.")
@@ -0,0 +1,54 @@
+import json
+from models import ScholarlyPaper, Author, SearchResponse
+from services.citation_service import render_citations
+from services.projection import ALL_FIELDS, LIST_FIELDS, select_fields, cache_suffix, dump_response
+
+def make_paper():
+    return ScholarlyPaper(title="Deep learning", authors=[Author(name="Yann LeCun")], year=2015,
+                          journal="Nature", doi="10.1038/nature14539", source_api="Test")
+
+def test_select_fields():
+    assert select_fields() == ALL_FIELDS
+    assert select_fields("list") == LIST_FIELDS
+    assert select_fields("list", "doi, year") == {"title", "doi", "year"}
+    assert cache_suffix(ALL_FIELDS) == "" and cache_suffix(LIST_FIELDS) == "|list"
+    assert cache_suffix(select_fields(fields="year,doi")) == cache_suffix(select_fields(fields="doi,year"))
+    for bad in ({"view": "tiny"}, {"fields": "doi,nope"}):
+        try:
+            select_fields(**bad)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+
+def test_only_requested_citations_are_rendered():
+    paper = make_paper()
+    render_citations(paper, {"bibtex"})
+    assert paper.bibtex and paper.ris is None and paper.formatted_citations == {}
+
+def test_dump_response_leaves_out_unrequested_fields():
+    paper = make_paper()
+    render_citations(paper)
+    full = json.loads(dump_response(SearchResponse(results=[paper], total_found=1, query="q")))
+    listed = json.loads(dump_response(SearchResponse(results=[paper], total_found=1, query="q", fields=LIST_FIELDS)))
+    assert set(full["results"][0]) == ALL_FIELDS and "fields" not in full
+    assert set(listed["results"][0]) == LIST_FIELDS
+    assert listed["total_found"] == 1 and listed["query"] == "q"
+
+def test_list_view_paper_renders_the_same_citations():
+    from fastapi.testclient import TestClient
+    import main
+
+    paper = make_paper()
+    paper.volume, paper.issue, paper.pages = "521", "7553", "436-444"
+    listed = json.loads(dump_response(SearchResponse(results=[paper], total_found=1, query="q", fields=LIST_FIELDS)))["results"][0]
+    response = TestClient(main.app).post("/citations", json=listed)
+    assert response.status_code == 200
+    render_citations(paper)
+    assert response.json()["bibtex"] == paper.bibtex and response.json()["formatted_citations"] == paper.formatted_citations
+
+if __name__ == "__main__":
+    test_select_fields()
+    test_only_requested_citations_are_rendered()
+    test_dump_response_leaves_out_unrequested_fields()
+    test_list_view_paper_renders_the_same_citations()
+    print("All projection tests passed.")
@@ -0,0 +1,60 @@
+from services.query import normalize_query
+
+def test_whitespace_case_and_unicode_variants_share_a_key():
+    variants = ["Deep  Learning", "deep learning", "deep learning ", "ＤＥＥＰ　learning"]
+    keys = {normalize_query(v).key for v in variants}
+    assert keys == {"deep learning"}
+    assert normalize_query("Deep  Learning ").text == "deep learning"
+
+def test_queries_sent_differently_never_share_a_key():
+    # Punctuation and short words change what upstreams return, so they stay in the key
+    groups = [
+        ["C programming", "C++ programming", "C# programming"],
+        ["vitamin A deficiency", "vitamin deficiency"],
+        ["to be or not to be", "not"],
+        ["the deep learning", "deep learning"],
+    ]
+    for group in groups:
+        queries = [normalize_query(raw) for raw in group]
+        assert len({q.key for q in queries}) == len(group), group
+        assert len({q.text for q in queries}) == len(group), group
+    assert normalize_query("C++ Programming").key == "c++ programming"
+
+def test_doi_extraction():
+    query = normalize_query("https://doi.org/10.1038/NATURE14539.")
+    assert query.doi == "10.1038/nature14539"
+    assert query.key == "doi:10.1038/nature14539"
+    assert normalize_query("doi:10.1038/nature14539").key == query.key
+    # Upstreams receive the bare DOI whichever form the user typed
+    assert query.text == "10.1038/nature14539"
+    # A DOI inside a longer query is searched as typed
+    mention = normalize_query("replication of 10.1038/nature14539")
+    assert mention.doi == "10.1038/nature14539" and mention.key == mention.text
+
+def test_arxiv_id_extraction():
+    for raw in ["2101.00001", "arXiv:2101.00001v2", "https://arxiv.org/abs/2101.00001", "10.48550/arXiv.2101.00001"]:
+        assert normalize_query(raw).key == normalize_query(raw).text == "arxiv:2101.00001", raw
+    assert normalize_query("hep-th/9901001").arxiv_id == "hep-th/9901001"
+    # An ID-like number inside a longer query is not an ID lookup
+    assert normalize_query("results from 2101.00001 replication").arxiv_id is None
+
+def test_adapter_rewrites():
+    from adapters.arxiv import ArxivAdapter
+    from adapters.core import CoreAdapter
+    assert ArxivAdapter().rewrite_query(normalize_query("Deep  Learning")) == "all:deep AND all:learning"
+    assert ArxivAdapter().rewrite_query(normalize_query("arXiv:2101.00001")) == "id:2101.00001"
+    assert ArxivAdapter().rewrite_query(normalize_query("10.1038/nature14539")) is None
+    assert CoreAdapter().rewrite_query(normalize_query("10.1038/nature14539")) == 'doi:"10.1038/nature14539"'
+    # A DOI inside a longer query is searched as text, not looked up
+    mentioned = normalize_query("survey of 10.1038/nature14539 deep learning")
+    assert mentioned.doi == "10.1038/nature14539" and not mentioned.is_doi
+    assert ArxivAdapter().rewrite_query(mentioned) == "all:survey AND all:of AND all:10 AND all:1038 AND all:nature14539 AND all:deep AND all:learning"
+    assert CoreAdapter().rewrite_query(mentioned) == "survey of 10.1038/nature14539 deep learning"
+
+if __name__ == "__main__":
+    test_whitespace_case_and_unicode_variants_share_a_key()
+    test_queries_sent_differently_never_share_a_key()
+    test_doi_extraction()
+    test_arxiv_id_extraction()
+    test_adapter_rewrites()
+    print("All query normalization tests passed.")
@@ -0,0 +1,108 @@
+import asyncio
+import time
+import uuid
+from config import settings
+from models import ScholarlyPaper, SearchResponse, SourceOutcome
+from services.http_cache import get_payload
+from services.refresh import PopularityTracker, RefreshScheduler
+from services.shared_store import background_budget
+
+def make_result(*outcomes):
+    return SearchResponse(results=[ScholarlyPaper(title="Deep learning", authors=[], source_api="Test")],
+                          total_found=1, query="deep learning", source_outcomes=list(outcomes))
+
+def test_popularity_decays_and_ranks():
+    tracker = PopularityTracker(half_life=60, max_keys=100)
+    for key, hits in (("a", 3), ("b", 1), ("c", 2)):
+        for _ in range(hits):
+            tracker.hit(key)
+    now = time.monotonic()
+    assert abs(tracker.score("a", now + 60) - tracker.score("a", now) / 2) < 1e-6
+    assert tracker.score("missing") == 0.0
+    assert tracker.top(2, 0.0) == ["a", "c"]
+    assert tracker.top(3, 1.5) == ["a", "c"]
+
+def test_trim_drops_coldest_tenth_and_their_computes():
+    async def compute():
+        return make_result()
+
+    previous = settings.refresh_max_tracked
+    settings.refresh_max_tracked = 20
+    try:
+        scheduler = RefreshScheduler()
+        for i in range(20):
+            for _ in range(2):
+                scheduler.track(f"warm-{i}", compute)
+        scheduler.track("cold-1", compute)
+        # Over the limit: the coldest tenth (two keys) go at once, the new key among them
+        assert len(scheduler.popularity._scores) == 19 and "cold-1" not in scheduler.popularity._scores
+        scheduler.track("cold-2", compute)
+        # Computes follow once their keys have been trimmed
+        assert set(scheduler._computes) == set(scheduler.popularity._scores)
+    finally:
+        settings.refresh_max_tracked = previous
+
+def test_refresh_discards_throttled_and_degraded_results():
+    scheduler = RefreshScheduler()
+
+    async def throttled():
+        background_budget.get().throttled = True
+        return make_result()
+
+    async def degraded():
+        return make_result(SourceOutcome(source="Crossref", status="timeout"))
+
+    async def healthy():
+        return make_result(SourceOutcome(source="Crossref"))
+
+    async def scenario():
+        keys = {}
+        for name, compute in (("throttled", throttled), ("degraded", degraded), ("healthy", healthy)):
+            keys[name] = f"test-refresh-{name}-{uuid.uuid4().hex}"
+            scheduler.track(keys[name], compute)
+        assert not await scheduler.refresh(keys["throttled"])
+        assert not await scheduler.refresh(keys["degraded"])
+        assert await scheduler.refresh(keys["healthy"])
+        # A second worker finds the lease taken
+        assert not await scheduler.refresh(keys["healthy"])
+        assert await get_payload(keys["throttled"]) is None and await get_payload(keys["degraded"]) is None
+        assert await get_payload(keys["healthy"]) is not None
+
+    asyncio.run(scenario())
+
+def test_run_yields_to_live_requests():
+    scheduler = RefreshScheduler()
+    refreshed = []
+
+    async def due():
+        return ["popular"]
+
+    async def refresh(key):
+        refreshed.append(key)
+        return True
+
+    scheduler.due, scheduler.refresh = due, refresh
+    previous = settings.refresh_interval
+    settings.refresh_interval = 0.01
+
+    async def run_for(seconds):
+        try:
+            await asyncio.wait_for(scheduler.run(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    try:
+        with scheduler.live():
+            asyncio.run(run_for(0.05))
+        assert refreshed == []
+        asyncio.run(run_for(0.05))
+        assert refreshed and set(refreshed) == {"popular"}
+    finally:
+        settings.refresh_interval = previous
+
+if __name__ == "__main__":
+    test_popularity_decays_and_ranks()
+    test_trim_drops_coldest_tenth_and_their_computes()
+    test_refresh_discards_throttled_and_degraded_results()
+    test_run_yields_to_live_requests()
+    print("All refresh tests passed.")
@@ -0,0 +1,59 @@
+import time
+from models import ScholarlyPaper, SourceOutcome
+from services.query import normalize_query
+from services.sessions import ResultSession, SessionStore
+
+def paper(i, citations=0, source="Test"):
+    return ScholarlyPaper(title=f"Paper {i}", authors=[], doi=f"10.1234/{i}", citation_count=citations, source_api=source)
+
+def test_pages_are_ranked_and_never_repeat():
+    session = ResultSession("token", normalize_query("paper"))
+    session.offsets = {"A": 0}
+    session.record_page("A", 3, [paper(1, 10), paper(2, 30), paper(3, 20)], SourceOutcome(source="A"))
+    assert session.offsets == {"A": 3}
+    assert [p.title for p in session.take(2)] == ["Paper 2", "Paper 3"]
+    # A later upstream page merges into the pending heap: a duplicate of a
+    # delivered paper is not served again, a merged pending one moves up
+    session.record_page("A", 3, [paper(2, 99), paper(1, 50), paper(4, 40)], SourceOutcome(source="A"))
+    assert [p.title for p in session.take(5)] == ["Paper 1", "Paper 4"]
+    assert len(session.index) == 4 and not session.pending
+
+def test_exhausted_or_failed_sources_stop_paging():
+    session = ResultSession("token", normalize_query("paper"))
+    session.offsets = {"A": 0, "B": 0}
+    session.record_page("A", 3, [paper(1)], SourceOutcome(source="A"))
+    session.record_page("B", 3, [], SourceOutcome(source="B", status="timeout"))
+    assert session.offsets == {} and session.has_more
+    session.take(10)
+    assert not session.has_more
+
+def test_store_expires_and_bounds_sessions():
+    store = SessionStore(max_sessions=2, ttl=60)
+    first = store.create(normalize_query("a"))
+    second = store.create(normalize_query("b"))
+    store.get(first.token)  # first is now the most recently used
+    store.create(normalize_query("c"))
+    assert len(store) == 2 and store.get(second.token) is None and store.get(first.token) is first
+    first.touched = time.monotonic() - 61
+    assert store.get(first.token) is None
+
+def test_shed_requests_leave_sessions_alone():
+    from fastapi.testclient import TestClient
+    import main
+    from services.admission import AdmissionController
+
+    stored = dict(main.sessions._sessions)
+    limits, main.admission = main.admission, AdmissionController(max_concurrent=1, per_client=0, max_queue=0, queue_timeout=0.1)
+    try:
+        response = TestClient(main.app).get("/search/session", params={"q": "deep learning"})
+        assert response.status_code == 429
+        assert dict(main.sessions._sessions) == stored
+    finally:
+        main.admission = limits
+
+if __name__ == "__main__":
+    test_pages_are_ranked_and_never_repeat()
+    test_exhausted_or_failed_sources_stop_paging()
+    test_store_expires_and_bounds_sessions()
+    test_shed_requests_leave_sessions_alone()
+    print("All session tests passed.")
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from models import ScholarlyPaper, Author
+from services.graph import graph
+from services.refresh import refresher
+from services.shared_store import store
+from services.snapshot import MAGIC, Snapshotter, decode, encode
+from services.suggest import suggest_index
+
+def reset_memory():
+    """What a restarted worker starts with."""
+    suggest_index.__init__(suggest_index.max_entries)
+    graph.__init__(graph.max_nodes, graph.citations_ttl)
+    refresher.popularity.__init__(1800.0, refresher.popularity.max_keys)
+
+def test_codec_round_trip():
+    state = {"suggest": [["title", "Deep learning", 2.5]], "store": [["oa:10.1234/x", "https://example.org/x.pdf", 1.5e9]]}
+    codec, body = encode(state)
+    assert decode(codec, body) == state
+
+def test_snapshot_survives_restart():
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.bin")
+    oa_key = f"oa:10.1234/{uuid.uuid4().hex}"
+    paper = ScholarlyPaper(title="Attention Is All You Need", authors=[Author(name="Ashish Vaswani")],
+                           doi="10.1234/attention", openalex_id="W2963403868", source_api="Test")
+
+    async def run():
+        reset_memory()
+        saver = Snapshotter(path)
+        # Nothing is written until the previous snapshot has been read back
+        assert not await saver.save() and not os.path.exists(path)
+        assert not await saver.restore()
+
+        suggest_index.add_papers([paper])
+        graph.add(paper, references=["W1", "W2"])
+        graph.set_citations("W2963403868", 25, ["W3"])
+        refresher.popularity.hit("search:attention")
+        store.set(oa_key, b"https://example.org/attention.pdf", 3600)
+        assert await saver.save()
+        with open(path, "rb") as f:
+            assert f.read().startswith(MAGIC)
+
+        reset_memory()
+        # Shorter-lived than the snapshot's copy, which wins on restore
+        store.set(oa_key, b"https://example.org/other.pdf", 60)
+        loader = Snapshotter(path)
+        assert await loader.restore()
+        assert [e.text for e in suggest_index.suggest("atten")] == ["Attention Is All You Need"]
+        assert graph.alias("10.1234/ATTENTION") == "W2963403868"
+        assert graph.references("W2963403868") == ["W1", "W2"]
+        assert graph.citations("W2963403868", 25) == ["W3"]
+        assert graph.node("W2963403868").title == paper.title
+        assert 0.9 < refresher.popularity.score("search:attention") <= 1.0
+        assert store.get(oa_key) == b"https://example.org/attention.pdf"
+
+    asyncio.run(run())
+
+def test_snapshot_for_other_models_is_ignored():
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.bin")
+
+    async def run():
+        reset_memory()
+        saver = Snapshotter(path)
+        await saver.restore()
+        suggest_index.add("Deep learning", "title")
+        assert await saver.save()
+        with open(path, "rb") as f:
+            data = f.read()
+        header, _, body = data[len(MAGIC):].partition(b"\n")
+        with open(path, "wb") as f:
+            f.write(MAGIC + header.replace(b'"version": "', b'"version": "0') + b"\n" + body)
+
+        reset_memory()
+        loader = Snapshotter(path)
+        assert not await loader.restore() and len(suggest_index) == 0
+        # Restoring is done either way, so the outdated file gets replaced
+        assert loader.restored
+
+    asyncio.run(run())
+
+def test_cancelled_restore_never_saves_over_the_snapshot():
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.bin")
+
+    async def run():
+        reset_memory()
+        saver = Snapshotter(path)
+        await saver.restore()
+        suggest_index.add("Deep learning", "title")
+        assert await saver.save()
+        with open(path, "rb") as f:
+            saved = f.read()
+
+        reset_memory()
+        loader = Snapshotter(path)
+        read = loader.read
+
+        def slow_read():
+            time.sleep(0.2)
+            return read()
+
+        loader.read = slow_read
+        # Shutdown during warm-up cancels the restore part-way
+        task = asyncio.create_task(loader.restore())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert not loader.restored
+        assert not await loader.save() and not await loader.save_on_shutdown()
+        with open(path, "rb") as f:
+            assert f.read() == saved
+
+    asyncio.run(run())
+
+def test_one_worker_saves_per_shutdown():
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.bin")
+    store._conn().execute("DELETE FROM cache WHERE key = 'snapshot-shutdown-lease'")
+
+    async def run():
+        first, second = Snapshotter(path), Snapshotter(path)
+        await first.restore()
+        await second.restore()
+        assert await first.save_on_shutdown()
+        assert not await second.save_on_shutdown()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_codec_round_trip()
+    test_snapshot_survives_restart()
+    test_snapshot_for_other_models_is_ignored()
+    test_cancelled_restore_never_saves_over_the_snapshot()
+    test_one_worker_saves_per_shutdown()
+    print("All snapshot tests passed.")
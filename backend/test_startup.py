@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules deferred until warm-up or the first request; none may load on `import main`.
+LAZY_MODULES = {
+    "httpx",
+    "adapters.base",
+    "adapters.crossref",
+    "adapters.openalex",
+    "adapters.semanticscholar",
+    "adapters.arxiv",
+    "adapters.core",
+    "services.citation_service",
+}
+
+# Framework packages whose import cost we cannot influence from this repo.
+FRAMEWORK_MODULES = {"fastapi", "pydantic", "pydantic_settings", "dotenv", "starlette", "typing_extensions"}
+
+# Budget for everything `import main` pulls in on top of the framework. Wall-clock
+# timings are noisy on shared machines, so this check runs only with RUN_TIMING_TESTS=1.
+IMPORT_BUDGET_MS = 60
+
+def measure_import_main():
+    """Runs `python -X importtime -c 'import main'` and returns [(module, level, cumulative_us)]."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), level, int(cumulative)))
+    return entries
+
+def own_import_ms(entries) -> float:
+    """Cumulative time of `import main` minus the framework packages imported anywhere below it."""
+    index = next(i for i, (name, _, _) in enumerate(entries) if name == "main")
+    _, main_level, main_total = entries[index]
+    framework_us = 0
+    skip_below = None
+    # importtime prints children before their parent, so walking backwards from
+    # main visits each module before its own imports.
+    for name, level, cumulative in reversed(entries[:index]):
+        if level <= main_level:
+            break
+        if skip_below is not None and level > skip_below:
+            continue  # already counted as part of a framework package
+        skip_below = None
+        if name.split(".")[0] in FRAMEWORK_MODULES:
+            framework_us += cumulative
+            skip_below = level
+    return (main_total - framework_us) / 1000
+
+def test_lazy_modules_stay_deferred():
+    eager = LAZY_MODULES & {name for name, _, _ in measure_import_main()}
+    assert not eager, f"Imported eagerly at startup: {sorted(eager)}"
+
+@pytest.mark.skipif(not os.environ.get("RUN_TIMING_TESTS"), reason="set RUN_TIMING_TESTS=1 to check the import-time budget")
+def test_import_time_budget():
+    entries = measure_import_main()
+    # Best of three runs filters out scheduler noise on shared CI machines
+    main_total = next(cumulative for name, _, cumulative in entries if name == "main")
+    own_ms = min([own_import_ms(entries)] + [own_import_ms(measure_import_main()) for _ in range(2)])
+    print(f"import main: {main_total / 1000:.1f} ms total, {own_ms:.1f} ms excluding framework")
+    assert own_ms < IMPORT_BUDGET_MS, f"import main costs {own_ms:.1f} ms over the framework (budget {IMPORT_BUDGET_MS} ms)"
+
+if __name__ == "__main__":
+    test_lazy_modules_stay_deferred()
+    test_import_time_budget()
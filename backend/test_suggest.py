@@ -0,0 +1,60 @@
+import os
+import time
+import pytest
+from models import ScholarlyPaper, Author
+from services.suggest import SuggestIndex, within_one_edit
+
+def make_index():
+    index = SuggestIndex(max_entries=100)
+    index.add_papers([
+        ScholarlyPaper(title="Deep Residual Learning for Image Recognition", authors=[Author(name="Kaiming He")],
+                       journal="CVPR", citation_count=200000, source_api="Test"),
+        ScholarlyPaper(title="Deep learning", authors=[Author(name="Yann LeCun")],
+                       journal="Nature", citation_count=80000, source_api="Test"),
+        ScholarlyPaper(title="Attention Is All You Need", authors=[Author(name="Ashish Vaswani")],
+                       journal="NeurIPS", citation_count=150000, source_api="Test"),
+    ])
+    return index
+
+def test_prefix_and_multi_token_matching():
+    index = make_index()
+    assert [e.text for e in index.suggest("deep lea")] == ["Deep learning", "Deep Residual Learning for Image Recognition"]
+    assert [e.text for e in index.suggest("atten")] == ["Attention Is All You Need"]
+    assert [e.text for e in index.suggest("lecun")] == ["Yann LeCun"]
+    # A completed word must match exactly rather than as a prefix
+    assert [e.text for e in index.suggest("deep ")] == ["Deep Residual Learning for Image Recognition", "Deep learning"]
+    assert index.suggest("quantum") == []
+
+def test_typo_tolerance():
+    index = make_index()
+    assert within_one_edit("lerning", "learning") and not within_one_edit("lrening", "learning")
+    assert "Deep learning" in [e.text for e in index.suggest("deep lerning")]
+    assert [e.text for e in index.suggest("atention")] == ["Attention Is All You Need"]
+
+def test_bounded_memory_evicts_least_recently_seen():
+    index = SuggestIndex(max_entries=2)
+    index.add("First title", "title")
+    index.add("Second title", "title")
+    index.add("First title", "title")  # seen again, so Second is now the oldest
+    index.add("Third title", "title")
+    assert len(index) == 2
+    assert [e.text for e in index.suggest("second")] == []
+    assert "second" not in index._postings
+
+# Wall-clock budgets are noisy on shared machines; opt in with RUN_TIMING_TESTS=1
+@pytest.mark.skipif(not os.environ.get("RUN_TIMING_TESTS"), reason="set RUN_TIMING_TESTS=1 to check suggest latency")
+def test_suggest_latency():
+    index = SuggestIndex(max_entries=50000)
+    for i in range(20000):
+        index.add(f"Study {i} of graph neural networks for molecule {i % 97} property prediction", "title")
+    start = time.perf_counter()
+    for query in ["graph neu", "molecule 4", "neurla netw", "study 1999"]:
+        index.suggest(query)
+    assert (time.perf_counter() - start) / 4 < 0.01
+
+if __name__ == "__main__":
+    test_prefix_and_multi_token_matching()
+    test_typo_tolerance()
+    test_bounded_memory_evicts_least_recently_seen()
+    test_suggest_latency()
+    print("All suggest tests passed.")
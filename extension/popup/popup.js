@@ -71,18 +71,108 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
-    const performSearch = async () => {
-        const query = searchInput.value.trim();
-        if (!query) return;
+    // Client-side result cache, persisted in chrome.storage so reopening the
+    // popup renders repeat queries without touching the backend.
+    const CACHE_KEY = 'resultCache';
+    const CACHE_TTL_MS = 15 * 60 * 1000;
+    const CACHE_MAX_ENTRIES = 30;
+    const CACHE_MAX_BYTES = 4 * 1024 * 1024; // chrome.storage.local allows 10 MB in total
+    const SEARCH_DEBOUNCE_MS = 600;
+    const MIN_AUTO_QUERY_LENGTH = 3;
+
+    let resultCache = null; // { [key]: { data, storedAt, usedAt, size } }
+    let inFlight = null; // { key, controller, promise }
+    let detectedQuery = null;
+    let debounceTimer = null;
+    let searchSeq = 0; // the latest performSearch call owns the spinner
+
+    // The result list only needs what it displays; citation strings (most of a
+    // full payload) are fetched when a paper is collected or exported.
+    const LIST_PARAMS = { '/search': '&view=list' };
+
+    // Sources that failed (or only had stale results) for this response
+    const degradedSources = (data) => (data.source_outcomes || [])
+        .filter(o => (o.status !== 'ok' && o.status !== 'skipped') || o.stale)
+        .map(o => o.source);
+
+    const cacheKeyFor = (endpoint, query) => `${endpoint}|${query.toLowerCase().replace(/\s+/g, ' ')}`;
+
+    const loadCache = () => {
+        if (resultCache) return Promise.resolve(resultCache);
+        return new Promise((resolve) => {
+            if (!chrome.storage?.local) {
+                resultCache = {};
+                resolve(resultCache);
+                return;
+            }
+            chrome.storage.local.get([CACHE_KEY], (stored) => {
+                resultCache = stored[CACHE_KEY] || {};
+                resolve(resultCache);
+            });
+        });
+    };
 
-        resultsList.innerHTML = '';
-        loading.classList.remove('hidden');
-        statusMsg.classList.add('hidden');
+    const persistCache = () => {
+        chrome.storage?.local?.set({ [CACHE_KEY]: resultCache });
+    };
 
-        const endpoint = currentMode === 'papers' ? '/search' : '/search/authors';
+    const evictCache = () => {
+        const now = Date.now();
+        let totalBytes = 0;
+        for (const [key, entry] of Object.entries(resultCache)) {
+            if (now - entry.storedAt > CACHE_TTL_MS) {
+                delete resultCache[key];
+            } else {
+                totalBytes += entry.size;
+            }
+        }
+        // Least recently used entries go first once either bound is exceeded
+        const byAge = Object.entries(resultCache).sort((a, b) => a[1].usedAt - b[1].usedAt);
+        while (byAge.length && (byAge.length > CACHE_MAX_ENTRIES || totalBytes > CACHE_MAX_BYTES)) {
+            const [key, entry] = byAge.shift();
+            totalBytes -= entry.size;
+            delete resultCache[key];
+        }
+    };
 
-        try {
-            const response = await fetch(`${API_BASE_URL}${endpoint}?q=${encodeURIComponent(query)}`);
+    const getCached = async (key) => {
+        const cache = await loadCache();
+        const entry = cache[key];
+        if (!entry) return null;
+        if (Date.now() - entry.storedAt > CACHE_TTL_MS) {
+            delete cache[key];
+            persistCache();
+            return null;
+        }
+        entry.usedAt = Date.now(); // persisted with the next write
+        return entry.data;
+    };
+
+    const putCached = async (key, data) => {
+        const cache = await loadCache();
+        const now = Date.now();
+        cache[key] = { data, storedAt: now, usedAt: now, size: JSON.stringify(data).length };
+        evictCache();
+        persistCache();
+    };
+
+    // Fetches through the cache. A newer request supersedes (aborts) the one in
+    // flight; an identical request joins it instead of starting another.
+    const fetchResults = async (endpoint, query) => {
+        const key = cacheKeyFor(endpoint, query);
+        const cached = await getCached(key);
+        if (cached) return cached;
+
+        if (inFlight) {
+            if (inFlight.key === key) return inFlight.promise;
+            inFlight.controller.abort();
+        }
+
+        const controller = new AbortController();
+        const promise = (async () => {
+            const response = await fetch(`${API_BASE_URL}${endpoint}?q=${encodeURIComponent(query)}${LIST_PARAMS[endpoint] || ''}`, {
+                signal: controller.signal
+            });
             if (!response.ok) {
                 let errorMessage = `Server error (${response.status})`;
                 try {
@@ -97,29 +187,143 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
                 throw new Error(errorMessage);
             }
-
             const data = await response.json();
+            // Partial results are shown but not kept; the next search retries the failed sources
+            if (data.results && data.results.length && !degradedSources(data).length) await putCached(key, data);
+            return data;
+        })();
+
+        const request = { key, controller, promise };
+        inFlight = request;
+        try {
+            return await promise;
+        } finally {
+            if (inFlight === request) inFlight = null;
+        }
+    };
+
+    const performSearch = async () => {
+        clearTimeout(debounceTimer);
+        const query = searchInput.value.trim() || detectedQuery;
+        if (!query) return;
+        if (!searchInput.value.trim()) searchInput.value = query;
+
+        const mode = currentMode;
+        const endpoint = mode === 'papers' ? '/search' : '/search/authors';
+
+        const searchId = ++searchSeq;
+        resultsList.innerHTML = '';
+        loading.classList.remove('hidden');
+        statusMsg.classList.add('hidden');
+
+        try {
+            const data = await fetchResults(endpoint, query);
+            // A later search or tab switch has taken over the view
+            if (mode !== currentMode || query !== searchInput.value.trim()) return;
             const results = data.results || [];
 
-            if (currentMode === 'papers') {
+            if (mode === 'papers') {
                 renderPaperResults(results);
             } else {
                 renderResearcherResults(results);
             }
 
+            const degraded = degradedSources(data);
+            if (degraded.length) {
+                showStatus(`Some sources were unavailable or out of date: ${degraded.join(', ')}`, 'warning');
+            }
+
             // Save state
             chrome.storage?.local?.set({
-                lastSearch: { query, mode: currentMode, results }
+                lastSearch: { query, mode, results }
             });
 
         } catch (error) {
+            if (error.name === 'AbortError') return;
             console.error('Search error details:', error);
             showStatus(error.message || 'Error connecting to server.', 'error');
         } finally {
-            loading.classList.add('hidden');
+            // A prefetch may still be in flight; only a newer search keeps the spinner
+            if (searchId === searchSeq) loading.classList.add('hidden');
+        }
+    };
+
+    // Search-as-you-type, debounced so only the settled query goes out
+    const scheduleSearch = () => {
+        clearTimeout(debounceTimer);
+        if (searchInput.value.trim().length < MIN_AUTO_QUERY_LENGTH) return;
+        debounceTimer = setTimeout(performSearch, SEARCH_DEBOUNCE_MS);
+    };
+
+    // Autocomplete from the backend's local index (no upstream calls, so a short debounce)
+    const SUGGEST_DEBOUNCE_MS = 150;
+    const suggestionList = document.getElementById('search-suggestions');
+    let suggestTimer = null;
+    let suggestController = null;
+
+    const fetchSuggestions = async () => {
+        const query = searchInput.value;
+        if (suggestController) suggestController.abort();
+        if (currentMode !== 'papers' || query.trim().length < 2) {
+            suggestionList.innerHTML = '';
+            return;
+        }
+        suggestController = new AbortController();
+        try {
+            const response = await fetch(`${API_BASE_URL}/suggest?q=${encodeURIComponent(query)}`, {
+                signal: suggestController.signal
+            });
+            if (!response.ok) return;
+            const data = await response.json();
+            suggestionList.innerHTML = '';
+            (data.suggestions || []).forEach(s => {
+                const option = document.createElement('option');
+                option.value = s.text;
+                suggestionList.appendChild(option);
+            });
+        } catch (error) {
+            // Suggestions are best-effort; aborted or failed requests leave the list as is
         }
     };
 
+    const scheduleSuggestions = () => {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(fetchSuggestions, SUGGEST_DEBOUNCE_MS);
+    };
+
+    // Prefetch results for the DOI / arXiv ID / title of the page the user is on
+    const DOI_PATTERN = /\b(10\.\d{4,9}\/[^\s?#&"'<>]+)/i;
+    const ARXIV_PATTERN = /arxiv\.org\/(?:abs|pdf)\/([\w.\-\/]+?\d)(?:v\d+)?(?:\.pdf)?(?:[?#]|$)/i;
+    const SCHOLARLY_HOSTS = /(doi\.org|sciencedirect\.com|springer\.com|nature\.com|ieeexplore\.ieee\.org|dl\.acm\.org|wiley\.com|tandfonline\.com|ncbi\.nlm\.nih\.gov|jstor\.org|semanticscholar\.org|openalex\.org)$/i;
+
+    const detectPageQuery = (tab) => {
+        const url = tab.url || '';
+        const arxivMatch = url.match(ARXIV_PATTERN);
+        if (arxivMatch) return arxivMatch[1];
+        const doiMatch = decodeURIComponent(url).match(DOI_PATTERN) || (tab.title || '').match(DOI_PATTERN);
+        if (doiMatch) return doiMatch[1].replace(/[.,;)]+$/, '');
+        try {
+            if (SCHOLARLY_HOSTS.test(new URL(url).hostname) && tab.title) {
+                return tab.title.split(/\s+[|\-–]\s+/)[0].trim();
+            }
+        } catch (urlErr) { }
+        return null;
+    };
+
+    const prefetchForActiveTab = async () => {
+        if (!chrome.tabs?.query) return;
+        const [tab] = await chrome.tabs.query({ active: true, lastFocusedWindow: true });
+        const query = tab && detectPageQuery(tab);
+        if (!query || query.length < MIN_AUTO_QUERY_LENGTH) return;
+        detectedQuery = query;
+        if (currentMode === 'papers' && !searchInput.value.trim()) {
+            searchInput.placeholder = `Detected: ${query} — press Enter`;
+        }
+        // Warm the cache only; never take over a search the user has started
+        if (inFlight) return;
+        fetchResults('/search', query).catch(() => { });
+    };
+
     const clearSearch = () => {
         searchInput.value = '';
         resultsList.innerHTML = `<div class="empty-state">
@@ -136,11 +340,30 @@ document.addEventListener('DOMContentLoaded', () => {
 
     document.getElementById('clear-search-btn')?.addEventListener('click', clearSearch);
 
-    const toggleCollect = (paper) => {
+    // Fills in the citation strings the list view leaves out. The backend renders
+    // them from the paper as sent, so this never re-runs the search upstream.
+    const withCitations = async (paper) => {
+        if (paper.bibtex) return paper;
+        const response = await fetch(`${API_BASE_URL}/citations`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(paper)
+        });
+        if (!response.ok) throw new Error(`Server error (${response.status})`);
+        return Object.assign(paper, await response.json());
+    };
+
+    const toggleCollect = async (paper) => {
         const index = collectedCitations.findIndex(c => (c.doi && c.doi === paper.doi) || (c.title === paper.title));
         if (index > -1) {
             collectedCitations.splice(index, 1);
         } else {
+            try {
+                await withCitations(paper);
+            } catch (error) {
+                showStatus('Could not load citations for this paper.', 'error');
+                return;
+            }
             // Keep the entire formatted_citations map for flexibility
             collectedCitations.push({
                 title: paper.title,
@@ -179,8 +402,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 (authors.length > 3 ? ' et al.' : '');
 
             const sources = paper.sources || [];
-            const pdfSource = sources.find(s => s.label === 'Open Access PDF');
-            const bestSource = sources.find(s => s.access_type === 'oa') || sources[0];
+            // Links the backend found unreachable are skipped in favour of working copies
+            const pdfSource = sources.find(s => s.label === 'Open Access PDF' && s.reachable !== false);
+            // best_oa_url may come from the backend's DOI index rather than this record's sources
+            const bestUrl = paper.best_oa_url ||
+                (sources.find(s => s.access_type === 'oa' && s.reachable !== false) || sources[0])?.url;
 
             const citations = paper.formatted_citations || {};
 
@@ -199,20 +425,20 @@ document.addEventListener('DOMContentLoaded', () => {
                 </div>
 
                 <div class="paper-actions">
-                    <a href="${bestSource?.url || '#'}" target="_blank" class="btn-action btn-paper">Open Source</a>
+                    <a href="${bestUrl || '#'}" target="_blank" class="btn-action btn-paper">Open Source</a>
                     ${pdfSource ? `<a href="${pdfSource.url}" target="_blank" class="btn-action btn-pdf">Open PDF</a>` : ''}
                 </div>
 
                 <div class="export-group">
-                    <button class="btn-export bibtex-btn" data-content="${encodeURIComponent(paper.bibtex || '')}" data-name="citation.bib">BibTeX</button>
-                    <button class="btn-export ris-btn" data-content="${encodeURIComponent(paper.ris || '')}" data-name="citation.ris">RIS</button>
+                    <button class="btn-export bibtex-btn">BibTeX</button>
+                    <button class="btn-export ris-btn">RIS</button>
                 </div>
             `;
             card.querySelector('.btn-collect').addEventListener('click', () => toggleCollect(paper));
+            card.querySelector('.bibtex-btn').addEventListener('click', () => exportCitation(paper, 'bibtex', 'citation.bib'));
+            card.querySelector('.ris-btn').addEventListener('click', () => exportCitation(paper, 'ris', 'citation.ris'));
             resultsList.appendChild(card);
         });
-
-        attachActionListeners();
     };
 
     const renderResearcherResults = (results, save = true) => {
@@ -256,14 +482,18 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     };
 
-    const attachActionListeners = () => {
-        document.querySelectorAll('.bibtex-btn, .ris-btn').forEach(btn => {
-            btn.addEventListener('click', (e) => {
-                const content = decodeURIComponent(e.target.dataset.content);
-                const name = e.target.dataset.name;
-                downloadFile(content, name, 'text/plain');
-            });
-        });
+    const exportCitation = async (paper, format, fileName) => {
+        try {
+            await withCitations(paper);
+        } catch (error) {
+            showStatus('Could not load citations for this paper.', 'error');
+            return;
+        }
+        if (!paper[format]) {
+            showStatus('No citation is available for this paper.', 'error');
+            return;
+        }
+        downloadFile(paper[format], fileName, 'text/plain');
     };
 
     const showEmpty = (msg) => {
@@ -360,6 +590,10 @@ document.addEventListener('DOMContentLoaded', () => {
     searchInput.addEventListener('keypress', (e) => {
         if (e.key === 'Enter') performSearch();
     });
+    searchInput.addEventListener('input', scheduleSearch);
+    searchInput.addEventListener('input', scheduleSuggestions);
+
+    prefetchForActiveTab();
 
     document.getElementById('open-sidepanel')?.addEventListener('click', async () => {
         // Open side panel